@@ -0,0 +1,48 @@
+"""store workflow execution timestamps as timestamptz
+
+Revision ID: a8b9c0d1e2f3
+Revises: f7a8b9c0d1e2
+Create Date: 2026-10-16 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8b9c0d1e2f3'
+down_revision: Union[str, None] = 'f7a8b9c0d1e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    for column in ('started_at', 'completed_at'):
+        op.alter_column(
+            'workflow_executions',
+            column,
+            type_=sa.DateTime(timezone=True),
+            existing_type=sa.String(length=50),
+            existing_nullable=True,
+            postgresql_using=f'{column}::timestamptz',
+        )
+    op.create_index(
+        'ix_workflow_executions_workflow_created',
+        'workflow_executions',
+        ['workflow_id', 'created_at'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_workflow_executions_workflow_created', table_name='workflow_executions')
+    for column in ('started_at', 'completed_at'):
+        op.alter_column(
+            'workflow_executions',
+            column,
+            type_=sa.String(length=50),
+            existing_type=sa.DateTime(timezone=True),
+            existing_nullable=True,
+            postgresql_using=f'{column}::text',
+        )
@@ -0,0 +1,25 @@
+"""add workflows (user_id, updated_at) index
+
+Revision ID: f7a8b9c0d1e2
+Revises: 7db4667ec451
+Create Date: 2026-10-16 10:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7a8b9c0d1e2'
+down_revision: Union[str, None] = '7db4667ec451'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_workflows_user_updated', 'workflows', ['user_id', 'updated_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_workflows_user_updated', table_name='workflows')
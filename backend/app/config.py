@@ -39,6 +39,9 @@ class Settings(BaseSettings):
             raise ValueError("JWT_SECRET_KEY must be changed from the example value")
         return v
 
+    # Passwords
+    bcrypt_rounds: int = 12  # bcrypt work factor (log2 iterations)
+
     # CORS
     cors_origins: str | list[str] = "http://localhost:5173,http://localhost:3000"
 
@@ -72,6 +75,11 @@ class Settings(BaseSettings):
     stripe_secret_key: str = ""
     stripe_webhook_secret: str = ""
     stripe_publishable_key: str = ""
+    stripe_webhook_concurrency: int = 20  # Max webhook events handled at once
+
+    # Workflows
+    workflow_node_cache_enabled: bool = True  # Let "cache": true nodes share results across runs
+    workflow_http_cache_ttl: int = 60  # Seconds a GET HTTP node result is reused
 
     # Storage
     storage_type: str = "local"
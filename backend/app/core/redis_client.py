@@ -0,0 +1,38 @@
+"""Shared async Redis client."""
+
+import logging
+
+import redis.asyncio as redis
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Redis client singleton (holds its own connection pool)
+_redis_client: redis.Redis | None = None
+
+
+def get_redis() -> redis.Redis:
+    """Get or create the shared Redis client."""
+    global _redis_client
+
+    if _redis_client is None:
+        _redis_client = redis.Redis(
+            host=settings.redis_host,
+            port=settings.redis_port,
+            decode_responses=True,
+            socket_timeout=5.0,
+            health_check_interval=30,
+        )
+        logger.info(f"Redis client initialized: {settings.redis_host}:{settings.redis_port}")
+
+    return _redis_client
+
+
+async def close_redis() -> None:
+    """Close the shared Redis client. Called on application shutdown."""
+    global _redis_client
+
+    if _redis_client is not None:
+        await _redis_client.aclose()
+        _redis_client = None
@@ -9,7 +9,7 @@ from app.config import settings
 def hash_password(password: str) -> str:
     """Hash a password using bcrypt."""
     password_bytes = password.encode("utf-8")
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=settings.bcrypt_rounds)
     return bcrypt.hashpw(password_bytes, salt).decode("utf-8")
 
 
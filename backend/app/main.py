@@ -12,6 +12,7 @@ from app.core.context import get_context
 from app.core.database import instrument_database_engine
 from app.core.exceptions import AppException
 from app.core.rate_limit import limiter, rate_limit_exceeded_handler
+from app.core.redis_client import close_redis
 from app.core.telemetry import (
     instrument_app,
     instrument_redis,
@@ -45,6 +46,8 @@ from app.routes.admin import system as admin_system
 from app.routes.admin import usage as admin_usage
 from app.routes.admin import users as admin_users
 from app.schemas.base import ErrorResponse
+from app.services.system_health import close_health_clients
+from app.services.workflow_engine import close_workflow_clients
 
 
 @asynccontextmanager
@@ -57,7 +60,10 @@ async def lifespan(app: FastAPI):
     instrument_redis()
     setup_metrics()
     yield
-    # Shutdown (cleanup if needed)
+    # Shutdown
+    await close_health_clients()
+    await close_workflow_clients()
+    await close_redis()
 
 
 app = FastAPI(
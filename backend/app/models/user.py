@@ -1,7 +1,8 @@
 import uuid
 
-from sqlalchemy import Boolean, String
+from sqlalchemy import Boolean, ColumnElement, String, func
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
@@ -79,6 +80,19 @@ class User(Base, TimestampMixin):
         cascade="all, delete-orphan",
     )
 
+    @hybrid_property
+    def display_name(self) -> str:
+        """Full name if set, otherwise the username."""
+        return f"{self.first_name or ''} {self.last_name or ''}".strip() or self.username
+
+    @display_name.inplace.expression
+    @classmethod
+    def _display_name_expression(cls) -> ColumnElement[str]:
+        return func.coalesce(
+            func.nullif(func.trim(func.concat_ws(" ", cls.first_name, cls.last_name)), ""),
+            cls.username,
+        )
+
     def __repr__(self) -> str:
         return f"<User(id={self.id}, email={self.email})>"
 
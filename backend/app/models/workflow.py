@@ -1,9 +1,10 @@
 """Workflow models for visual workflow builder."""
 
 import uuid
+from datetime import datetime
 from enum import Enum
 
-from sqlalchemy import Boolean, ForeignKey, String, Text
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, String, Text
 from sqlalchemy.dialects.postgresql import JSON, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -87,6 +88,14 @@ class Workflow(Base, TimestampMixin):
         cascade="all, delete-orphan",
     )
 
+    # Listing filters by owner and sorts by last update
+    __table_args__ = (
+        Index("ix_workflows_user_updated", "user_id", "updated_at"),
+    )
+
+    # Read server-set timestamps back with RETURNING on flush
+    __mapper_args__ = {"eager_defaults": True}
+
     def __repr__(self) -> str:
         return f"<Workflow(id={self.id}, name={self.name}, status={self.status})>"
 
@@ -126,7 +135,7 @@ class WorkflowExecution(Base, TimestampMixin):
     inputs: Mapped[dict | None] = mapped_column(JSON, nullable=True, default=dict)
     outputs: Mapped[dict | None] = mapped_column(JSON, nullable=True, default=dict)
 
-    # Execution details
+    # Execution details (node_states is deprecated: no longer written or returned)
     node_states: Mapped[dict | None] = mapped_column(JSON, nullable=True, default=dict)
     current_node_id: Mapped[str | None] = mapped_column(String(100), nullable=True)
     error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -135,8 +144,8 @@ class WorkflowExecution(Base, TimestampMixin):
     logs: Mapped[list | None] = mapped_column(JSON, nullable=True, default=list)
 
     # Timing
-    started_at: Mapped[str | None] = mapped_column(String(50), nullable=True)
-    completed_at: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    completed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
     # Token usage
     total_tokens: Mapped[int | None] = mapped_column(default=0)
@@ -145,6 +154,14 @@ class WorkflowExecution(Base, TimestampMixin):
     workflow: Mapped["Workflow"] = relationship(back_populates="executions")
     user: Mapped["User"] = relationship(back_populates="workflow_executions")
 
+    # Execution history is listed per workflow, newest first
+    __table_args__ = (
+        Index("ix_workflow_executions_workflow_created", "workflow_id", "created_at"),
+    )
+
+    # Read server-set timestamps back with RETURNING on flush
+    __mapper_args__ = {"eager_defaults": True}
+
     def __repr__(self) -> str:
         return f"<WorkflowExecution(id={self.id}, workflow_id={self.workflow_id}, status={self.status})>"
 
@@ -1,6 +1,7 @@
 """Document API endpoints."""
 
 import uuid
+from collections.abc import AsyncIterator
 
 from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, UploadFile
 from fastapi.responses import Response
@@ -24,6 +25,13 @@ router = APIRouter(prefix="/documents", tags=["documents"])
 
 ALLOWED_FILE_TYPES = {"pdf", "docx", "txt", "md", "csv"}
 MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+
+async def _iter_upload(file: UploadFile) -> AsyncIterator[bytes]:
+    """Yield an uploaded file in chunks so it never sits fully in memory."""
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        yield chunk
 
 
 @router.post("", status_code=201)
@@ -53,9 +61,11 @@ async def upload_document(
             detail=f"File type '{file_ext}' not allowed. Allowed types: {', '.join(ALLOWED_FILE_TYPES)}",
         )
 
-    # Read file content
-    file_content = await file.read()
-    file_size = len(file_content)
+    # Size is reported by the multipart parser; measure it only as a fallback
+    file_size = file.size
+    if file_size is None:
+        file_size = len(await file.read())
+        await file.seek(0)
 
     # Validate file size
     if file_size > MAX_FILE_SIZE:
@@ -71,7 +81,7 @@ async def upload_document(
         filename=file.filename,
         file_type=file_ext,
         file_size=file_size,
-        file_content=file_content,
+        file_content=_iter_upload(file),
     )
 
     # Commit transaction before starting background task
@@ -1,3 +1,5 @@
+import asyncio
+
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -30,9 +32,11 @@ async def readiness_check(
     Checks database and LiteLLM connectivity.
     Returns ready only if all critical services are available.
     """
-    # Check critical services
-    db_health = await check_postgresql_health(db)
-    litellm_health = await check_litellm_health()
+    # Check critical services concurrently
+    db_health, litellm_health = await asyncio.gather(
+        check_postgresql_health(db),
+        check_litellm_health(),
+    )
 
     # Determine if ready
     is_ready = (
@@ -76,10 +80,12 @@ async def detailed_health_check(
     Detailed health check endpoint.
     Returns status of all services including Redis.
     """
-    # Check all services
-    db_health = await check_postgresql_health(db)
-    litellm_health = await check_litellm_health()
-    redis_health = await check_redis_health()
+    # Check all services concurrently
+    db_health, litellm_health, redis_health = await asyncio.gather(
+        check_postgresql_health(db),
+        check_litellm_health(),
+        check_redis_health(),
+    )
 
     # Determine overall status
     all_healthy = all(
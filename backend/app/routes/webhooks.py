@@ -59,9 +59,10 @@ async def stripe_webhook(
         else:
             # No webhook secret configured, parse without verification (dev mode)
             logger.warning("Processing webhook without signature verification (dev mode)")
-            event = stripe.Event.construct_from(json.loads(payload), stripe.api_key)
+            event = json.loads(payload)
 
-        logger.info(f"Processing Stripe webhook: {event.type}")
+        event_type = event["type"]
+        logger.info(f"Processing Stripe webhook: {event_type}")
 
         # Process the event using stripe_service
         result = await stripe_service.process_webhook_event(
@@ -70,13 +71,13 @@ async def stripe_webhook(
         )
 
         if result:
-            logger.info(f"Successfully processed {event.type}")
+            logger.info(f"Successfully processed {event_type}")
         else:
-            logger.debug(f"No action taken for {event.type}")
+            logger.debug(f"No action taken for {event_type}")
 
         return BaseResponse(
             trace_id=ctx.trace_id,
-            data=MessageResponse(message=f"Processed {event.type}"),
+            data=MessageResponse(message=f"Processed {event_type}"),
         )
 
     except stripe_service.StripeError as e:
@@ -27,6 +27,14 @@ from app.services import workflow as workflow_service
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/workflows", tags=["workflows"])
 
+# Compact separators keep per-token SSE frames small
+_encode_event = json.JSONEncoder(separators=(",", ":"), default=str).encode
+
+
+def _sse_event(event: dict) -> bytes:
+    """Encode an event as a ready-to-send SSE data frame."""
+    return b"data: " + _encode_event(event).encode() + b"\n\n"
+
 
 # =============================================================================
 # Workflow Chat Schema
@@ -290,12 +298,11 @@ async def workflow_chat_stream(
                 user_id=current_user.id,
                 inputs={"query": data.message, "message": data.message},
             ):
-                yield f"data: {json.dumps(event)}\n\n"
+                yield _sse_event(event)
 
         except Exception as e:
             logger.error(f"Workflow chat error: {e}")
-            error_data = json.dumps({"error": str(e), "done": True})
-            yield f"data: {error_data}\n\n"
+            yield _sse_event({"error": str(e), "done": True})
 
     return StreamingResponse(
         event_generator(),
@@ -229,12 +229,11 @@ class WorkflowExecutionInfo(BaseModel):
     status: ExecutionStatus
     inputs: dict | None = None
     outputs: dict | None = None
-    node_states: dict | None = None
     current_node_id: str | None = None
     error_message: str | None = None
     logs: list[NodeExecutionLog] = Field(default_factory=list)
-    started_at: str | None = None
-    completed_at: str | None = None
+    started_at: datetime | None = None
+    completed_at: datetime | None = None
     total_tokens: int = 0
     created_at: datetime
     updated_at: datetime
@@ -2,6 +2,7 @@
 
 import logging
 import uuid
+from collections.abc import AsyncIterator
 from math import ceil
 
 from sqlalchemy import func, select
@@ -27,7 +28,7 @@ async def create_document(
     filename: str,
     file_type: str,
     file_size: int,
-    file_content: bytes,
+    file_content: bytes | AsyncIterator[bytes],
 ) -> Document:
     """
     Create a new document and upload file to storage.
@@ -38,7 +39,7 @@ async def create_document(
         filename: Original filename
         file_type: File extension (pdf, docx, txt, md, csv)
         file_size: File size in bytes
-        file_content: Raw file bytes
+        file_content: Raw file bytes, or an async iterator of chunks to stream
 
     Returns:
         Created Document instance
@@ -46,7 +47,10 @@ async def create_document(
     storage = get_storage_service()
 
     # Upload file to storage
-    file_path = await storage.upload(file_content, filename, user_id)
+    if isinstance(file_content, bytes):
+        file_path = await storage.upload(file_content, filename, user_id)
+    else:
+        file_path = await storage.upload_stream(file_content, filename, user_id)
 
     # Create document record
     document = Document(
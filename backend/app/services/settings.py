@@ -3,7 +3,8 @@
 import logging
 from typing import Any
 
-from sqlalchemy import select
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.telemetry import traced
@@ -180,11 +181,15 @@ def _mask_secret(value: str | None) -> str | None:
     return value[:4] + "*" * (len(value) - 8) + value[-4:]
 
 
+# Truthy strings accepted by _parse_bool (stored values are normally lowercase)
+_TRUE_VALUES = frozenset({"true", "1", "yes", "on"})
+
+
 def _parse_bool(value: str | None) -> bool:
     """Parse a string boolean value."""
     if value is None:
         return False
-    return value.lower() in ("true", "1", "yes", "on")
+    return value in _TRUE_VALUES or value.lower() in _TRUE_VALUES
 
 
 def _parse_int(value: str | None, default: int = 0) -> int:
@@ -257,21 +262,41 @@ async def create_setting(
     is_editable: bool = True,
 ) -> Setting:
     """Create a new setting."""
-    setting = Setting(
-        key=key,
-        value=value,
-        value_json=value_json,
-        category=category,
-        description=description,
-        is_secret=is_secret,
-        is_editable=is_editable,
+    # RETURNING reads back server defaults without a separate refresh SELECT
+    stmt = (
+        insert(Setting)
+        .values(
+            key=key,
+            value=value,
+            value_json=value_json,
+            category=category,
+            description=description,
+            is_secret=is_secret,
+            is_editable=is_editable,
+        )
+        .returning(Setting)
     )
-    db.add(setting)
+    setting = (await db.scalars(stmt)).one()
     await db.commit()
-    await db.refresh(setting)
     return setting
 
 
+def _changed_values(
+    value: str | None,
+    value_json: dict | None,
+    description: str | None,
+) -> dict[str, Any]:
+    """Build the column values to write for a partial setting update."""
+    changes: dict[str, Any] = {}
+    if value is not None:
+        changes["value"] = value
+    if value_json is not None:
+        changes["value_json"] = value_json
+    if description is not None:
+        changes["description"] = description
+    return changes
+
+
 @traced()
 async def update_setting(
     db: AsyncSession,
@@ -281,22 +306,27 @@ async def update_setting(
     description: str | None = None,
 ) -> Setting | None:
     """Update an existing setting."""
-    setting = await get_setting(db, key)
-    if setting is None:
-        return None
-
-    if not setting.is_editable:
-        raise ValueError(f"Setting '{key}' is not editable")
+    changes = _changed_values(value, value_json, description)
+    setting = None
+    if changes:
+        stmt = (
+            update(Setting)
+            .where(Setting.key == key, Setting.is_editable.is_(True))
+            .values(**changes)
+            .returning(Setting)
+        )
+        result = await db.scalars(stmt, execution_options={"populate_existing": True})
+        setting = result.one_or_none()
 
-    if value is not None:
-        setting.value = value
-    if value_json is not None:
-        setting.value_json = value_json
-    if description is not None:
-        setting.description = description
+    if setting is None:
+        # Nothing was written: either the key is missing or the row is locked
+        setting = await get_setting(db, key)
+        if setting is None:
+            return None
+        if not setting.is_editable:
+            raise ValueError(f"Setting '{key}' is not editable")
 
     await db.commit()
-    await db.refresh(setting)
     return setting
 
 
@@ -311,32 +341,29 @@ async def upsert_setting(
     is_secret: bool | None = None,
 ) -> Setting:
     """Create or update a setting."""
-    setting = await get_setting(db, key)
-
-    if setting is None:
-        # Create new setting
-        default_config = DEFAULT_SETTINGS.get(key, {})
-        setting = Setting(
-            key=key,
-            value=value,
-            value_json=value_json,
-            category=category or default_config.get("category", SettingCategory.GENERAL.value),
-            description=description or default_config.get("description"),
-            is_secret=is_secret if is_secret is not None else default_config.get("is_secret", False),
-            is_editable=True,
-        )
-        db.add(setting)
-    else:
-        # Update existing setting
-        if value is not None:
-            setting.value = value
-        if value_json is not None:
-            setting.value_json = value_json
-        if description is not None:
-            setting.description = description
+    default_config = DEFAULT_SETTINGS.get(key, {})
+    stmt = insert(Setting).values(
+        key=key,
+        value=value,
+        value_json=value_json,
+        category=category or default_config.get("category", SettingCategory.GENERAL.value),
+        description=description or default_config.get("description"),
+        is_secret=is_secret if is_secret is not None else default_config.get("is_secret", False),
+        is_editable=True,
+    )
 
+    # On conflict, only overwrite the fields that were provided
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Setting.key],
+        set_={
+            **_changed_values(value, value_json, description),
+            "updated_at": func.now(),
+        },
+    ).returning(Setting)
+
+    result = await db.scalars(stmt, execution_options={"populate_existing": True})
+    setting = result.one()
     await db.commit()
-    await db.refresh(setting)
     return setting
 
 
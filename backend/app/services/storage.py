@@ -3,6 +3,8 @@
 import logging
 import uuid
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
+from functools import lru_cache
 from pathlib import Path
 
 import aiofiles
@@ -13,6 +15,9 @@ from app.core.telemetry import traced
 
 logger = logging.getLogger(__name__)
 
+# Resolved once so every default-configured service shares the same base path
+_DEFAULT_BASE_PATH = Path(settings.storage_local_path).resolve()
+
 
 class StorageService(ABC):
     """Abstract base class for file storage operations."""
@@ -32,6 +37,23 @@ class StorageService(ABC):
         """
         pass
 
+    @abstractmethod
+    async def upload_stream(
+        self, chunks: AsyncIterator[bytes], filename: str, user_id: uuid.UUID
+    ) -> str:
+        """
+        Upload a file to storage from an async stream of chunks.
+
+        Args:
+            chunks: Async iterator yielding file content
+            filename: Original filename
+            user_id: ID of the user uploading the file
+
+        Returns:
+            Storage path where the file was saved
+        """
+        pass
+
     @abstractmethod
     async def download(self, path: str) -> bytes:
         """
@@ -72,6 +94,11 @@ class StorageService(ABC):
         pass
 
 
+async def _single_chunk(data: bytes) -> AsyncIterator[bytes]:
+    """Wrap in-memory file content as a one-chunk stream."""
+    yield data
+
+
 class PathTraversalError(Exception):
     """Raised when a path traversal attack is detected."""
 
@@ -88,7 +115,7 @@ class LocalStorageService(StorageService):
         Args:
             base_path: Base directory for file storage (defaults to settings)
         """
-        self.base_path = Path(base_path or settings.storage_local_path).resolve()
+        self.base_path = Path(base_path).resolve() if base_path else _DEFAULT_BASE_PATH
 
     def _validate_path(self, path: str) -> Path:
         """
@@ -124,6 +151,13 @@ class LocalStorageService(StorageService):
     @traced()
     async def upload(self, file: bytes, filename: str, user_id: uuid.UUID) -> str:
         """Upload file to local filesystem."""
+        return await self.upload_stream(_single_chunk(file), filename, user_id)
+
+    @traced()
+    async def upload_stream(
+        self, chunks: AsyncIterator[bytes], filename: str, user_id: uuid.UUID
+    ) -> str:
+        """Stream file chunks to local filesystem without buffering the whole file."""
         # Create path: {base_path}/{user_id}/{uuid}_{filename}
         user_dir = self.base_path / str(user_id)
         await self._ensure_directory(user_dir)
@@ -135,7 +169,8 @@ class LocalStorageService(StorageService):
 
         # Write file
         async with aiofiles.open(file_path, "wb") as f:
-            await f.write(file)
+            async for chunk in chunks:
+                await f.write(chunk)
 
         # Return relative path from base_path
         return str(file_path.relative_to(self.base_path))
@@ -169,23 +204,16 @@ class LocalStorageService(StorageService):
         return await aiofiles.os.path.exists(file_path)
 
 
-# Storage service singleton
-_storage_service: StorageService | None = None
-
-
+@lru_cache(maxsize=1)
 def get_storage_service() -> StorageService:
     """
     Factory function to get storage service instance.
 
+    The instance is cached, so concurrent first callers share one service.
+
     Returns:
         StorageService instance based on configuration
     """
-    global _storage_service
-
-    if _storage_service is None:
-        if settings.storage_type == "local":
-            _storage_service = LocalStorageService()
-        else:
-            raise ValueError(f"Unknown storage type: {settings.storage_type}")
-
-    return _storage_service
+    if settings.storage_type == "local":
+        return LocalStorageService()
+    raise ValueError(f"Unknown storage type: {settings.storage_type}")
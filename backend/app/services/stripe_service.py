@@ -6,14 +6,25 @@ Handles payment processing with Stripe including:
 - Webhook event handling
 """
 
+import asyncio
+import json
 import logging
 import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
 from datetime import UTC, datetime
-from typing import Any
+from itertools import islice
+from typing import Any, Final, TypedDict
 
 import stripe
+from redis.exceptions import RedisError
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
 from app.config import settings
+from app.core.redis_client import get_redis
 from app.core.telemetry import traced
 from app.models.invoice import Invoice, InvoiceStatus, PaymentMethod
 from app.models.plan import Plan
@@ -27,12 +38,88 @@ logger = logging.getLogger(__name__)
 stripe.api_key = settings.stripe_secret_key
 
 
+# Stripe subscription status -> our subscription status
+STRIPE_STATUS_MAP: Final[dict[str, SubscriptionStatus]] = {
+    "active": SubscriptionStatus.ACTIVE,
+    "trialing": SubscriptionStatus.TRIALING,
+    "past_due": SubscriptionStatus.PAST_DUE,
+    "canceled": SubscriptionStatus.CANCELED,
+    "paused": SubscriptionStatus.PAUSED,
+}
+
+
 class StripeError(Exception):
     """Exception for Stripe-related errors."""
 
     pass
 
 
+class StripeEventData(TypedDict):
+    """The data member of a Stripe event."""
+
+    object: dict[str, Any]
+
+
+class StripeEvent(TypedDict):
+    """Typed view of the Stripe event envelope, decoded as plain JSON."""
+
+    id: str
+    type: str
+    data: StripeEventData
+
+
+def _from_timestamp(value: int | None) -> datetime | None:
+    """Convert an optional Stripe Unix timestamp to an aware UTC datetime."""
+    return datetime.fromtimestamp(value, tz=UTC) if value else None
+
+
+@dataclass(frozen=True, slots=True)
+class SubscriptionMetadata:
+    """Our metadata attached to Stripe checkout sessions and subscriptions."""
+
+    user_id: uuid.UUID | None
+    plan_id: uuid.UUID | None
+    billing_interval: str = "monthly"
+
+
+def _parse_uuid(value: str | None) -> uuid.UUID | None:
+    """Parse a UUID string, returning None if it is missing or malformed."""
+    if not value:
+        return None
+    try:
+        return uuid.UUID(value)
+    except ValueError:
+        return None
+
+
+def _parse_subscription_metadata(metadata: dict[str, str] | None) -> SubscriptionMetadata:
+    """Parse subscription metadata once; bad or missing IDs become None."""
+    metadata = metadata or {}
+    return SubscriptionMetadata(
+        user_id=_parse_uuid(metadata.get("user_id")),
+        plan_id=_parse_uuid(metadata.get("plan_id")),
+        billing_interval=metadata.get("billing_interval") or "monthly",
+    )
+
+
+# Upper bound on invoice lines copied into Invoice.line_items
+MAX_INVOICE_LINE_ITEMS = 100
+
+
+def _invoice_line_items(line_data: list[dict[str, Any]]) -> list[dict[str, Any]] | None:
+    """Project Stripe invoice lines down to the fields we store."""
+    if not line_data:
+        return None
+    return [
+        {
+            "description": line.get("description"),
+            "amount": line["amount"] / 100,
+            "quantity": line.get("quantity"),
+        }
+        for line in islice(line_data, MAX_INVOICE_LINE_ITEMS)
+    ]
+
+
 # ============================================================================
 # Checkout Session
 # ============================================================================
@@ -144,7 +231,7 @@ async def get_or_create_customer(user: User) -> str:
         # Create new customer
         customer = stripe.Customer.create(
             email=user.email,
-            name=f"{user.first_name or ''} {user.last_name or ''}".strip() or user.username,
+            name=user.display_name,
             metadata={
                 "user_id": str(user.id),
                 "username": user.username,
@@ -213,36 +300,44 @@ async def create_customer_portal_session(
 async def verify_webhook_signature(
     payload: bytes,
     signature: str,
-) -> stripe.Event:
+) -> StripeEvent:
     """
-    Verify webhook signature and construct event.
+    Verify webhook signature and parse the event.
+
+    The event is returned as plain JSON data rather than a stripe.Event,
+    which would wrap every nested object (including large invoice line
+    lists) in StripeObject instances.
 
     Args:
         payload: Raw request body
         signature: Stripe signature header
 
     Returns:
-        Verified Stripe event
+        Verified Stripe event data
     """
     if not settings.stripe_webhook_secret:
         raise StripeError("Stripe webhook secret not configured")
 
     try:
-        event = stripe.Webhook.construct_event(
-            payload,
+        stripe.WebhookSignature.verify_header(
+            payload.decode("utf-8"),
             signature,
             settings.stripe_webhook_secret,
         )
-        return event
     except stripe.SignatureVerificationError as e:
         logger.error(f"Webhook signature verification failed: {e}")
         raise StripeError("Invalid webhook signature") from e
 
+    try:
+        return json.loads(payload)
+    except ValueError as e:
+        raise StripeError("Invalid webhook payload") from e
+
 
 @traced()
 async def handle_subscription_created(
-    db_session: Any,
-    event: stripe.Event,
+    db_session: AsyncSession,
+    event: StripeEvent,
 ) -> Subscription | None:
     """
     Handle customer.subscription.created webhook.
@@ -251,56 +346,38 @@ async def handle_subscription_created(
 
     Args:
         db_session: Database session
-        event: Stripe event
+        event: Stripe event data
 
     Returns:
         Created Subscription or None
     """
-    from sqlalchemy import select
-    from sqlalchemy.ext.asyncio import AsyncSession
-
-    db: AsyncSession = db_session
-    stripe_sub = event.data.object
+    stripe_sub = event["data"]["object"]
 
-    logger.info(f"Processing subscription created: {stripe_sub.id}")
+    logger.info(f"Processing subscription created: {stripe_sub['id']}")
 
     # Extract metadata
-    metadata = stripe_sub.metadata
-    user_id_str = metadata.get("user_id")
-    plan_id_str = metadata.get("plan_id")
-    billing_interval_str = metadata.get("billing_interval", "monthly")
-
-    if not user_id_str or not plan_id_str:
-        logger.error(f"Missing metadata in subscription {stripe_sub.id}")
+    metadata = _parse_subscription_metadata(stripe_sub.get("metadata"))
+    if metadata.user_id is None or metadata.plan_id is None:
+        logger.error(f"Missing or invalid metadata in subscription {stripe_sub['id']}")
         return None
 
-    try:
-        user_id = uuid.UUID(user_id_str)
-        plan_id = uuid.UUID(plan_id_str)
-    except ValueError as e:
-        logger.error(f"Invalid UUID in metadata: {e}")
-        return None
-
-    # Get user and plan
-    user_result = await db.execute(select(User).where(User.id == user_id))
-    user = user_result.scalar_one_or_none()
+    user_id = metadata.user_id
+    plan_id = metadata.plan_id
+    billing_interval_str = metadata.billing_interval
 
-    plan_result = await db.execute(select(Plan).where(Plan.id == plan_id))
-    plan = plan_result.scalar_one_or_none()
+    # Get user and plan in a single round-trip
+    row = (
+        await db_session.execute(select(User, Plan).where(User.id == user_id, Plan.id == plan_id))
+    ).one_or_none()
 
-    if not user or not plan:
+    if row is None:
         logger.error(f"User {user_id} or Plan {plan_id} not found")
         return None
 
+    user, plan = row
+
     # Map Stripe status to our status
-    status_map = {
-        "active": SubscriptionStatus.ACTIVE,
-        "trialing": SubscriptionStatus.TRIALING,
-        "past_due": SubscriptionStatus.PAST_DUE,
-        "canceled": SubscriptionStatus.CANCELED,
-        "paused": SubscriptionStatus.PAUSED,
-    }
-    status = status_map.get(stripe_sub.status, SubscriptionStatus.ACTIVE)
+    status = STRIPE_STATUS_MAP.get(stripe_sub.get("status"), SubscriptionStatus.ACTIVE)
 
     billing_interval = (
         BillingInterval.YEARLY if billing_interval_str == "yearly" else BillingInterval.MONTHLY
@@ -314,35 +391,31 @@ async def handle_subscription_created(
         billing_interval=billing_interval_str,
     )
 
-    # Create subscription record
-    subscription = Subscription(
-        user_id=user.id,
-        plan_id=plan.id,
-        status=status,
-        billing_interval=billing_interval,
-        start_date=datetime.fromtimestamp(stripe_sub.start_date, tz=UTC),
-        current_period_start=datetime.fromtimestamp(
-            stripe_sub.current_period_start, tz=UTC
-        ) if stripe_sub.current_period_start else None,
-        current_period_end=datetime.fromtimestamp(
-            stripe_sub.current_period_end, tz=UTC
-        ) if stripe_sub.current_period_end else None,
-        trial_end_date=datetime.fromtimestamp(
-            stripe_sub.trial_end, tz=UTC
-        ) if stripe_sub.trial_end else None,
-        stripe_subscription_id=stripe_sub.id,
-        stripe_customer_id=stripe_sub.customer,
-        litellm_key_id=key_data.get("key_id"),
-    )
-
-    db.add(subscription)
+    # Create subscription record, reading server defaults back via RETURNING
+    subscription = (
+        await db_session.scalars(
+            insert(Subscription)
+            .values(
+                user_id=user.id,
+                plan_id=plan.id,
+                status=status,
+                billing_interval=billing_interval,
+                start_date=datetime.fromtimestamp(stripe_sub["start_date"], tz=UTC),
+                current_period_start=_from_timestamp(stripe_sub.get("current_period_start")),
+                current_period_end=_from_timestamp(stripe_sub.get("current_period_end")),
+                trial_end_date=_from_timestamp(stripe_sub.get("trial_end")),
+                stripe_subscription_id=stripe_sub["id"],
+                stripe_customer_id=stripe_sub.get("customer"),
+                litellm_key_id=key_data.get("key_id"),
+            )
+            .returning(Subscription)
+        )
+    ).one()
 
     # Update user tier
     user.tier = plan.plan_type.value
-    db.add(user)
 
-    await db.commit()
-    await db.refresh(subscription)
+    await db_session.commit()
 
     logger.info(f"Created subscription {subscription.id} for user {user.id}")
     return subscription
@@ -350,8 +423,8 @@ async def handle_subscription_created(
 
 @traced()
 async def handle_subscription_updated(
-    db_session: Any,
-    event: stripe.Event,
+    db_session: AsyncSession,
+    event: StripeEvent,
 ) -> Subscription | None:
     """
     Handle customer.subscription.updated webhook.
@@ -360,90 +433,72 @@ async def handle_subscription_updated(
 
     Args:
         db_session: Database session
-        event: Stripe event
+        event: Stripe event data
 
     Returns:
         Updated Subscription or None
     """
-    from sqlalchemy import select
-    from sqlalchemy.ext.asyncio import AsyncSession
+    stripe_sub = event["data"]["object"]
 
-    db: AsyncSession = db_session
-    stripe_sub = event.data.object
-
-    logger.info(f"Processing subscription updated: {stripe_sub.id}")
+    logger.info(f"Processing subscription updated: {stripe_sub['id']}")
 
     # Find existing subscription
-    result = await db.execute(
-        select(Subscription).where(Subscription.stripe_subscription_id == stripe_sub.id)
+    result = await db_session.execute(
+        select(Subscription).where(Subscription.stripe_subscription_id == stripe_sub["id"])
     )
     subscription = result.scalar_one_or_none()
 
     if not subscription:
-        logger.warning(f"Subscription not found for Stripe ID {stripe_sub.id}")
+        logger.warning(f"Subscription not found for Stripe ID {stripe_sub['id']}")
         return None
 
     # Map Stripe status
-    status_map = {
-        "active": SubscriptionStatus.ACTIVE,
-        "trialing": SubscriptionStatus.TRIALING,
-        "past_due": SubscriptionStatus.PAST_DUE,
-        "canceled": SubscriptionStatus.CANCELED,
-        "paused": SubscriptionStatus.PAUSED,
-    }
-    new_status = status_map.get(stripe_sub.status, subscription.status)
+    new_status = STRIPE_STATUS_MAP.get(stripe_sub.get("status"), subscription.status)
 
     # Check if plan changed
-    metadata = stripe_sub.metadata
-    new_plan_id_str = metadata.get("plan_id")
+    plan_id = subscription.plan_id
+    metadata = _parse_subscription_metadata(stripe_sub.get("metadata"))
+    new_plan_id = metadata.plan_id
+
+    if new_plan_id and new_plan_id != subscription.plan_id:
+        # Plan changed - update LiteLLM key
+        plan_result = await db_session.execute(select(Plan).where(Plan.id == new_plan_id))
+        new_plan = plan_result.scalar_one_or_none()
+
+        if new_plan and subscription.litellm_key_id:
+            await litellm_keys.update_key_for_plan_change(
+                key_id=subscription.litellm_key_id,
+                new_plan=new_plan,
+                billing_interval=metadata.billing_interval,
+            )
+            plan_id = new_plan_id
 
-    if new_plan_id_str:
-        try:
-            new_plan_id = uuid.UUID(new_plan_id_str)
-            if new_plan_id != subscription.plan_id:
-                # Plan changed - update LiteLLM key
-                plan_result = await db.execute(select(Plan).where(Plan.id == new_plan_id))
-                new_plan = plan_result.scalar_one_or_none()
-
-                if new_plan and subscription.litellm_key_id:
-                    billing_interval = metadata.get("billing_interval", "monthly")
-                    await litellm_keys.update_key_for_plan_change(
-                        key_id=subscription.litellm_key_id,
-                        new_plan=new_plan,
-                        billing_interval=billing_interval,
-                    )
-                    subscription.plan_id = new_plan_id
-
-                    # Update user tier
-                    user_result = await db.execute(
-                        select(User).where(User.id == subscription.user_id)
-                    )
-                    user = user_result.scalar_one_or_none()
-                    if user:
-                        user.tier = new_plan.plan_type.value
-                        db.add(user)
-
-        except ValueError:
-            pass
+            # Update user tier in place, no need to load the row
+            await db_session.execute(
+                update(User)
+                .where(User.id == subscription.user_id)
+                .values(tier=new_plan.plan_type.value)
+            )
 
     # Update subscription fields
-    subscription.status = new_status
-    if stripe_sub.current_period_start:
-        subscription.current_period_start = datetime.fromtimestamp(
-            stripe_sub.current_period_start, tz=UTC
-        )
-    if stripe_sub.current_period_end:
-        subscription.current_period_end = datetime.fromtimestamp(
-            stripe_sub.current_period_end, tz=UTC
+    changes: dict[str, Any] = {"status": new_status, "plan_id": plan_id}
+    if stripe_sub.get("current_period_start"):
+        changes["current_period_start"] = _from_timestamp(stripe_sub.get("current_period_start"))
+    if stripe_sub.get("current_period_end"):
+        changes["current_period_end"] = _from_timestamp(stripe_sub.get("current_period_end"))
+    if stripe_sub.get("canceled_at"):
+        changes["canceled_at"] = _from_timestamp(stripe_sub.get("canceled_at"))
+
+    subscription = (
+        await db_session.scalars(
+            update(Subscription)
+            .where(Subscription.id == subscription.id)
+            .values(**changes)
+            .returning(Subscription),
+            execution_options={"populate_existing": True},
         )
-    if stripe_sub.canceled_at:
-        subscription.canceled_at = datetime.fromtimestamp(
-            stripe_sub.canceled_at, tz=UTC
-        )
-
-    db.add(subscription)
-    await db.commit()
-    await db.refresh(subscription)
+    ).one()
+    await db_session.commit()
 
     logger.info(f"Updated subscription {subscription.id}")
     return subscription
@@ -451,8 +506,8 @@ async def handle_subscription_updated(
 
 @traced()
 async def handle_subscription_deleted(
-    db_session: Any,
-    event: stripe.Event,
+    db_session: AsyncSession,
+    event: StripeEvent,
 ) -> Subscription | None:
     """
     Handle customer.subscription.deleted webhook.
@@ -461,48 +516,44 @@ async def handle_subscription_deleted(
 
     Args:
         db_session: Database session
-        event: Stripe event
+        event: Stripe event data
 
     Returns:
         Canceled Subscription or None
     """
-    from sqlalchemy import select
-    from sqlalchemy.ext.asyncio import AsyncSession
-
-    db: AsyncSession = db_session
-    stripe_sub = event.data.object
-
-    logger.info(f"Processing subscription deleted: {stripe_sub.id}")
-
-    # Find existing subscription
-    result = await db.execute(
-        select(Subscription).where(Subscription.stripe_subscription_id == stripe_sub.id)
+    stripe_sub = event["data"]["object"]
+
+    logger.info(f"Processing subscription deleted: {stripe_sub['id']}")
+
+    # Cancel the subscription and read it back in one statement
+    now = datetime.now(UTC)
+    result = await db_session.scalars(
+        update(Subscription)
+        .where(Subscription.stripe_subscription_id == stripe_sub["id"])
+        .values(status=SubscriptionStatus.CANCELED, canceled_at=now, end_date=now)
+        .returning(Subscription),
+        execution_options={"populate_existing": True},
     )
-    subscription = result.scalar_one_or_none()
+    subscription = result.one_or_none()
 
     if not subscription:
-        logger.warning(f"Subscription not found for Stripe ID {stripe_sub.id}")
+        logger.warning(f"Subscription not found for Stripe ID {stripe_sub['id']}")
         return None
 
-    # Disable LiteLLM key
-    if subscription.litellm_key_id:
-        await litellm_keys.suspend_key_for_subscription(subscription.litellm_key_id)
-
-    # Update subscription
-    subscription.status = SubscriptionStatus.CANCELED
-    subscription.canceled_at = datetime.now(UTC)
-    subscription.end_date = datetime.now(UTC)
+    # Update user tier to free in the same transaction
+    await db_session.execute(
+        update(User).where(User.id == subscription.user_id).values(tier="free")
+    )
 
-    # Update user tier to free
-    user_result = await db.execute(select(User).where(User.id == subscription.user_id))
-    user = user_result.scalar_one_or_none()
-    if user:
-        user.tier = "free"
-        db.add(user)
+    await db_session.commit()
 
-    db.add(subscription)
-    await db.commit()
-    await db.refresh(subscription)
+    # Disable LiteLLM key only after the commit so the row lock is not held
+    # across the LiteLLM call
+    if subscription.litellm_key_id:
+        if await litellm_keys.suspend_key_for_subscription(subscription.litellm_key_id):
+            logger.info(f"Suspended key {subscription.litellm_key_id}")
+        else:
+            logger.warning(f"Failed to suspend key {subscription.litellm_key_id}")
 
     logger.info(f"Canceled subscription {subscription.id}")
     return subscription
@@ -510,8 +561,8 @@ async def handle_subscription_deleted(
 
 @traced()
 async def handle_invoice_paid(
-    db_session: Any,
-    event: stripe.Event,
+    db_session: AsyncSession,
+    event: StripeEvent,
 ) -> Invoice | None:
     """
     Handle invoice.paid webhook.
@@ -520,109 +571,103 @@ async def handle_invoice_paid(
 
     Args:
         db_session: Database session
-        event: Stripe event
+        event: Stripe event data
 
     Returns:
         Created Invoice or None
     """
-    from sqlalchemy import select
-    from sqlalchemy.ext.asyncio import AsyncSession
-
-    db: AsyncSession = db_session
-    stripe_invoice = event.data.object
+    stripe_invoice = event["data"]["object"]
 
-    logger.info(f"Processing invoice paid: {stripe_invoice.id}")
-
-    # Check if invoice already recorded
-    existing = await db.execute(
-        select(Invoice).where(Invoice.stripe_invoice_id == stripe_invoice.id)
-    )
-    if existing.scalar_one_or_none():
-        logger.info(f"Invoice {stripe_invoice.id} already recorded")
-        return None
+    logger.info(f"Processing invoice paid: {stripe_invoice['id']}")
 
-    # Find subscription
+    # Find subscription together with its user and plan
     subscription = None
-    if stripe_invoice.subscription:
-        sub_result = await db.execute(
-            select(Subscription).where(
-                Subscription.stripe_subscription_id == stripe_invoice.subscription
-            )
+    if stripe_invoice.get("subscription"):
+        sub_result = await db_session.execute(
+            select(Subscription)
+            .options(joinedload(Subscription.user), joinedload(Subscription.plan))
+            .where(Subscription.stripe_subscription_id == stripe_invoice.get("subscription"))
         )
         subscription = sub_result.scalar_one_or_none()
 
     # Find user by customer ID
-    customer_id = stripe_invoice.customer
+    customer_id = stripe_invoice.get("customer")
     user = None
     if subscription:
-        user_result = await db.execute(
-            select(User).where(User.id == subscription.user_id)
-        )
-        user = user_result.scalar_one_or_none()
+        user = subscription.user
     else:
         # Try to find by customer ID in subscriptions
-        sub_result = await db.execute(
-            select(Subscription).where(Subscription.stripe_customer_id == customer_id)
+        sub_result = await db_session.execute(
+            select(Subscription)
+            .options(joinedload(Subscription.user))
+            .where(Subscription.stripe_customer_id == customer_id)
         )
         sub = sub_result.scalar_one_or_none()
         if sub:
-            user_result = await db.execute(select(User).where(User.id == sub.user_id))
-            user = user_result.scalar_one_or_none()
+            user = sub.user
 
     if not user:
-        logger.warning(f"User not found for invoice {stripe_invoice.id}")
+        logger.warning(f"User not found for invoice {stripe_invoice['id']}")
         return None
 
     # Generate invoice number
-    invoice_count = await db.execute(
-        select(Invoice).where(Invoice.user_id == user.id)
-    )
-    count = len(invoice_count.scalars().all())
+    count = await db_session.scalar(
+        select(func.count()).select_from(Invoice).where(Invoice.user_id == user.id)
+    ) or 0
     invoice_number = f"INV-{user.id.hex[:8].upper()}-{count + 1:04d}"
 
     # Create invoice record
-    invoice = Invoice(
-        user_id=user.id,
-        subscription_id=subscription.id if subscription else None,
-        invoice_number=invoice_number,
-        status=InvoiceStatus.PAID,
-        description=f"Subscription payment - {stripe_invoice.lines.data[0].description if stripe_invoice.lines.data else 'Subscription'}",
-        subtotal=stripe_invoice.subtotal / 100,  # Convert from cents
-        tax=stripe_invoice.tax / 100 if stripe_invoice.tax else 0,
-        discount=stripe_invoice.total_discount_amounts[0].amount / 100 if stripe_invoice.total_discount_amounts else 0,
-        total=stripe_invoice.total / 100,
-        amount_paid=stripe_invoice.amount_paid / 100,
-        amount_due=stripe_invoice.amount_remaining / 100,
-        currency=stripe_invoice.currency.upper(),
-        invoice_date=datetime.fromtimestamp(stripe_invoice.created, tz=UTC),
-        due_date=datetime.fromtimestamp(stripe_invoice.due_date, tz=UTC) if stripe_invoice.due_date else None,
-        paid_at=datetime.fromtimestamp(stripe_invoice.status_transitions.paid_at, tz=UTC) if stripe_invoice.status_transitions and stripe_invoice.status_transitions.paid_at else datetime.now(UTC),
-        period_start=datetime.fromtimestamp(stripe_invoice.period_start, tz=UTC) if stripe_invoice.period_start else None,
-        period_end=datetime.fromtimestamp(stripe_invoice.period_end, tz=UTC) if stripe_invoice.period_end else None,
-        payment_method=PaymentMethod.CARD,
-        stripe_invoice_id=stripe_invoice.id,
-        stripe_payment_intent_id=stripe_invoice.payment_intent,
-        stripe_hosted_invoice_url=stripe_invoice.hosted_invoice_url,
-        stripe_invoice_pdf=stripe_invoice.invoice_pdf,
-        line_items=[
-            {
-                "description": line.description,
-                "amount": line.amount / 100,
-                "quantity": line.quantity,
-            }
-            for line in stripe_invoice.lines.data
-        ] if stripe_invoice.lines.data else None,
-    )
-
-    db.add(invoice)
+    line_data = (stripe_invoice.get("lines") or {}).get("data") or []
+    # A redelivered invoice hits the unique stripe_invoice_id and inserts nothing
+    invoice = (
+        await db_session.scalars(
+            insert(Invoice)
+            .values(
+                user_id=user.id,
+                subscription_id=subscription.id if subscription else None,
+                invoice_number=invoice_number,
+                status=InvoiceStatus.PAID,
+                description=f"Subscription payment - {line_data[0].get('description') if line_data else 'Subscription'}",
+                subtotal=stripe_invoice["subtotal"] / 100,  # Convert from cents
+                tax=(stripe_invoice.get("tax") or 0) / 100,
+                discount=stripe_invoice["total_discount_amounts"][0]["amount"] / 100 if stripe_invoice.get("total_discount_amounts") else 0,
+                total=stripe_invoice["total"] / 100,
+                amount_paid=stripe_invoice["amount_paid"] / 100,
+                amount_due=stripe_invoice["amount_remaining"] / 100,
+                currency=stripe_invoice["currency"].upper(),
+                invoice_date=datetime.fromtimestamp(stripe_invoice["created"], tz=UTC),
+                due_date=_from_timestamp(stripe_invoice.get("due_date")),
+                paid_at=_from_timestamp((stripe_invoice.get("status_transitions") or {}).get("paid_at")) or datetime.now(UTC),
+                period_start=_from_timestamp(stripe_invoice.get("period_start")),
+                period_end=_from_timestamp(stripe_invoice.get("period_end")),
+                payment_method=PaymentMethod.CARD,
+                stripe_invoice_id=stripe_invoice["id"],
+                stripe_payment_intent_id=stripe_invoice.get("payment_intent"),
+                stripe_hosted_invoice_url=stripe_invoice.get("hosted_invoice_url"),
+                stripe_invoice_pdf=stripe_invoice.get("invoice_pdf"),
+                line_items=_invoice_line_items(line_data),
+            )
+            .on_conflict_do_nothing(index_elements=[Invoice.stripe_invoice_id])
+            .returning(Invoice)
+        )
+    ).one_or_none()
+    if invoice is None:
+        logger.info(f"Invoice {stripe_invoice['id']} already recorded")
+        return None
 
-    # Reset LiteLLM key budget for new billing period
+    # Reset LiteLLM key budget for new billing period, overlapping the commit
+    reset_task = None
     if subscription and subscription.litellm_key_id:
-        await litellm_keys.reset_key_budget(subscription.litellm_key_id)
-        logger.info(f"Reset budget for key {subscription.litellm_key_id}")
+        reset_task = asyncio.create_task(litellm_keys.reset_key_budget(subscription.litellm_key_id))
 
-    await db.commit()
-    await db.refresh(invoice)
+    try:
+        await db_session.commit()
+    finally:
+        if reset_task is not None:
+            if await reset_task:
+                logger.info(f"Reset budget for key {subscription.litellm_key_id}")
+            else:
+                logger.warning(f"Budget reset failed for key {subscription.litellm_key_id}")
 
     # Send payment success notification
     try:
@@ -630,16 +675,11 @@ async def handle_invoice_paid(
 
         # Get plan name for notification
         plan_name = None
-        if subscription:
-            plan_result = await db.execute(
-                select(Plan).where(Plan.id == subscription.plan_id)
-            )
-            plan = plan_result.scalar_one_or_none()
-            if plan:
-                plan_name = plan.display_name
+        if subscription and subscription.plan:
+            plan_name = subscription.plan.display_name
 
         await notification_service.notify_payment_success(
-            db=db,
+            db=db_session,
             user_id=user.id,
             amount=invoice.total,
             currency=invoice.currency,
@@ -650,7 +690,7 @@ async def handle_invoice_paid(
         # Also send subscription renewed notification if it's a renewal
         if subscription and plan_name:
             await notification_service.notify_subscription_renewed(
-                db=db,
+                db=db_session,
                 user_id=user.id,
                 plan_name=plan_name,
                 next_billing_date=subscription.current_period_end,
@@ -665,8 +705,8 @@ async def handle_invoice_paid(
 
 @traced()
 async def handle_invoice_payment_failed(
-    db_session: Any,
-    event: stripe.Event,
+    db_session: AsyncSession,
+    event: StripeEvent,
 ) -> None:
     """
     Handle invoice.payment_failed webhook.
@@ -675,42 +715,37 @@ async def handle_invoice_payment_failed(
 
     Args:
         db_session: Database session
-        event: Stripe event
+        event: Stripe event data
     """
-    from sqlalchemy import select
-    from sqlalchemy.ext.asyncio import AsyncSession
-
-    db: AsyncSession = db_session
-    stripe_invoice = event.data.object
+    stripe_invoice = event["data"]["object"]
 
-    logger.warning(f"Processing invoice payment failed: {stripe_invoice.id}")
+    logger.warning(f"Processing invoice payment failed: {stripe_invoice['id']}")
 
-    if not stripe_invoice.subscription:
+    if not stripe_invoice.get("subscription"):
         return
 
     # Find subscription
-    result = await db.execute(
+    result = await db_session.execute(
         select(Subscription).where(
-            Subscription.stripe_subscription_id == stripe_invoice.subscription
+            Subscription.stripe_subscription_id == stripe_invoice.get("subscription")
         )
     )
     subscription = result.scalar_one_or_none()
 
     if subscription:
         subscription.status = SubscriptionStatus.PAST_DUE
-        db.add(subscription)
-        await db.commit()
+        await db_session.commit()
         logger.info(f"Marked subscription {subscription.id} as past_due")
 
         # Send payment failed notification
         try:
             from app.services import notification as notification_service
 
-            amount = stripe_invoice.amount_due / 100 if stripe_invoice.amount_due else 0
-            currency = stripe_invoice.currency.upper() if stripe_invoice.currency else "USD"
+            amount = (stripe_invoice.get("amount_due") or 0) / 100
+            currency = (stripe_invoice.get("currency") or "usd").upper()
 
             await notification_service.notify_payment_failed(
-                db=db,
+                db=db_session,
                 user_id=subscription.user_id,
                 amount=amount,
                 currency=currency,
@@ -726,7 +761,10 @@ async def handle_invoice_payment_failed(
 # ============================================================================
 
 
-WEBHOOK_HANDLERS = {
+WebhookHandler = Callable[[AsyncSession, StripeEvent], Awaitable[Any]]
+
+# Stripe event type -> handler
+WEBHOOK_HANDLERS: Final[dict[str, WebhookHandler]] = {
     "customer.subscription.created": handle_subscription_created,
     "customer.subscription.updated": handle_subscription_updated,
     "customer.subscription.deleted": handle_subscription_deleted,
@@ -734,28 +772,92 @@ WEBHOOK_HANDLERS = {
     "invoice.payment_failed": handle_invoice_payment_failed,
 }
 
+# Caps how many webhook handlers hit the database and LiteLLM at once so a
+# burst of Stripe deliveries cannot exhaust the connection pool
+_webhook_semaphore = asyncio.Semaphore(settings.stripe_webhook_concurrency)
+
+# Redis idempotency keys for delivered events. Stripe retries deliveries for
+# days, so completed events are remembered for a day; the shorter processing
+# lease lets a crashed worker's claim expire.
+WEBHOOK_EVENT_KEY_PREFIX = "stripe:evt:"
+WEBHOOK_EVENT_DONE_TTL = 86400
+WEBHOOK_EVENT_PROCESSING_TTL = 300
+
+
+async def _claim_webhook_event(event_id: str) -> bool:
+    """
+    Claim a webhook event for processing.
+
+    Returns:
+        True if this worker should process the event, False if it was
+        already processed
+
+    Raises:
+        StripeError: If another worker is still processing the event
+    """
+    key = f"{WEBHOOK_EVENT_KEY_PREFIX}{event_id}"
+    try:
+        redis_client = get_redis()
+        if await redis_client.set(key, "processing", nx=True, ex=WEBHOOK_EVENT_PROCESSING_TTL):
+            return True
+        state = await redis_client.get(key)
+    except RedisError as e:
+        # Fail open: the handlers are safe to run again, just slower
+        logger.warning(f"Webhook idempotency check unavailable: {e}")
+        return True
+
+    if state == "processing":
+        # Let Stripe retry later instead of acknowledging work that may fail
+        raise StripeError(f"Event {event_id} is already being processed")
+    return False
+
+
+async def _release_webhook_event(event_id: str, done: bool) -> None:
+    """Mark a claimed event as done, or drop the claim so it can be retried."""
+    key = f"{WEBHOOK_EVENT_KEY_PREFIX}{event_id}"
+    try:
+        redis_client = get_redis()
+        if done:
+            await redis_client.set(key, "done", ex=WEBHOOK_EVENT_DONE_TTL)
+        else:
+            await redis_client.delete(key)
+    except RedisError as e:
+        logger.warning(f"Failed to update webhook idempotency key: {e}")
+
 
 @traced()
 async def process_webhook_event(
-    db_session: Any,
-    event: stripe.Event,
+    db_session: AsyncSession,
+    event: StripeEvent,
 ) -> Any:
     """
     Process a verified Stripe webhook event.
 
     Args:
         db_session: Database session
-        event: Verified Stripe event
+        event: Verified Stripe event data
 
     Returns:
         Result from handler or None
     """
-    event_type = event.type
+    event_type = event["type"]
+    event_id = event["id"]
     handler = WEBHOOK_HANDLERS.get(event_type)
 
     if handler:
+        if not await _claim_webhook_event(event_id):
+            logger.info(f"Skipping already processed webhook event {event_id}")
+            return None
+
         logger.info(f"Processing webhook event: {event_type}")
-        return await handler(db_session, event)
+        try:
+            async with _webhook_semaphore:
+                result = await handler(db_session, event)
+        except BaseException:
+            await _release_webhook_event(event_id, done=False)
+            raise
+        await _release_webhook_event(event_id, done=True)
+        return result
     else:
         logger.debug(f"Unhandled webhook event type: {event_type}")
         return None
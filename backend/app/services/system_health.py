@@ -1,5 +1,6 @@
 """System health monitoring service."""
 
+import asyncio
 import logging
 import time
 from datetime import UTC, datetime
@@ -10,6 +11,7 @@ from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
+from app.core.redis_client import get_redis
 from app.core.telemetry import traced
 from app.schemas.admin import (
     LiteLLMHealth,
@@ -23,47 +25,118 @@ from app.schemas.admin import (
 logger = logging.getLogger(__name__)
 
 
+# Shared HTTP client so LiteLLM probes reuse pooled connections
+_litellm_client: httpx.AsyncClient | None = None
+
+
+def _get_litellm_client() -> httpx.AsyncClient:
+    """Get or create the HTTP client used for LiteLLM probes."""
+    global _litellm_client
+
+    if _litellm_client is None:
+        _litellm_client = httpx.AsyncClient(
+            timeout=5.0,
+            limits=httpx.Limits(max_keepalive_connections=4),
+        )
+
+    return _litellm_client
+
+
+async def close_health_clients() -> None:
+    """Close shared probe clients. Called on application shutdown."""
+    global _litellm_client
+
+    if _litellm_client is not None:
+        await _litellm_client.aclose()
+        _litellm_client = None
+
+
+def _count_models(models_response: httpx.Response | BaseException) -> int | None:
+    """Extract the model count from a LiteLLM /models response, or None on failure."""
+    if isinstance(models_response, BaseException):
+        logger.debug(f"Failed to fetch model count: {models_response}")
+        return None
+    if models_response.status_code != 200:
+        return None
+    try:
+        return len(models_response.json().get("data", []))
+    except Exception as e:
+        logger.debug(f"Unexpected error fetching model count: {e}")
+        return None
+
+
+# The model catalog only changes on deploy, so /models is refetched at most once a minute
+MODELS_COUNT_CACHE_TTL_SECONDS = 60
+_models_count_cache: tuple[int, float] | None = None
+
+
+def _get_cached_models_count() -> int | None:
+    """Get the cached model count if it is younger than MODELS_COUNT_CACHE_TTL_SECONDS."""
+    if _models_count_cache is not None:
+        value, fetched_at = _models_count_cache
+        if time.monotonic() - fetched_at < MODELS_COUNT_CACHE_TTL_SECONDS:
+            return value
+    return None
+
+
+def _store_models_count(models_response: httpx.Response | BaseException) -> int:
+    """Cache the model count from a /models response, keeping the last good value on failure."""
+    global _models_count_cache
+
+    count = _count_models(models_response)
+    if count is None:
+        return _models_count_cache[0] if _models_count_cache is not None else 0
+
+    _models_count_cache = (count, time.monotonic())
+    return count
+
+
 @traced()
 async def check_litellm_health() -> LiteLLMHealth:
     """Check LiteLLM proxy health status."""
     url = settings.litellm_api_url
 
     try:
-        start_time = time.time()
-        async with httpx.AsyncClient(timeout=5.0) as client:
+        client = _get_litellm_client()
+
+        async def probe_health() -> tuple[httpx.Response, float]:
+            # Timed on its own so a slow /models refresh doesn't inflate it
+            start_time = time.time()
             response = await client.get(f"{url}/health")
-            response_time_ms = (time.time() - start_time) * 1000
-
-            if response.status_code == 200:
-                # Try to get model count
-                models_count = 0
-                try:
-                    models_response = await client.get(
-                        f"{url}/models",
-                        headers={"Authorization": f"Bearer {settings.litellm_api_key}"}
-                    )
-                    if models_response.status_code == 200:
-                        models_data = models_response.json()
-                        if "data" in models_data:
-                            models_count = len(models_data["data"])
-                except httpx.HTTPError as e:
-                    logger.debug(f"Failed to fetch model count: {e}")
-                except Exception as e:
-                    logger.debug(f"Unexpected error fetching model count: {e}")
-
-                return LiteLLMHealth(
-                    status=ServiceStatus.HEALTHY,
-                    url=url,
-                    response_time_ms=round(response_time_ms, 2),
-                    models_available=models_count,
-                )
-            else:
-                return LiteLLMHealth(
-                    status=ServiceStatus.DEGRADED,
-                    url=url,
-                    response_time_ms=round(response_time_ms, 2),
-                    error=f"HTTP {response.status_code}",
-                )
+            return response, (time.time() - start_time) * 1000
+
+        models_available = _get_cached_models_count()
+        if models_available is None:
+            # Probe health and refresh the model list in parallel
+            probe, models_response = await asyncio.gather(
+                probe_health(),
+                client.get(
+                    f"{url}/models",
+                    headers={"Authorization": f"Bearer {settings.litellm_api_key}"},
+                ),
+                return_exceptions=True,
+            )
+            models_available = _store_models_count(models_response)
+            if isinstance(probe, BaseException):
+                raise probe
+            response, response_time_ms = probe
+        else:
+            response, response_time_ms = await probe_health()
+
+        if response.status_code == 200:
+            return LiteLLMHealth(
+                status=ServiceStatus.HEALTHY,
+                url=url,
+                response_time_ms=round(response_time_ms, 2),
+                models_available=models_available,
+            )
+        else:
+            return LiteLLMHealth(
+                status=ServiceStatus.DEGRADED,
+                url=url,
+                response_time_ms=round(response_time_ms, 2),
+                error=f"HTTP {response.status_code}",
+            )
     except httpx.TimeoutException:
         return LiteLLMHealth(
             status=ServiceStatus.UNHEALTHY,
@@ -84,10 +157,38 @@ async def check_litellm_health() -> LiteLLMHealth:
         )
 
 
+def _postgresql_host() -> str:
+    """Get the PostgreSQL host:port from the configured database URL."""
+    return settings.database_url.split("@")[-1].split("/")[0] if "@" in settings.database_url else "localhost"
+
+
+# max_connections only changes on server restart, so cache it for a while
+MAX_CONNECTIONS_CACHE_TTL_SECONDS = 300
+_max_connections_cache: tuple[int, float] | None = None
+
+
+async def _get_max_connections(db: AsyncSession) -> int:
+    """Get PostgreSQL max_connections, cached for MAX_CONNECTIONS_CACHE_TTL_SECONDS."""
+    global _max_connections_cache
+
+    now = time.monotonic()
+    if _max_connections_cache is not None:
+        value, fetched_at = _max_connections_cache
+        if now - fetched_at < MAX_CONNECTIONS_CACHE_TTL_SECONDS:
+            return value
+
+    result = await db.execute(
+        text("SELECT setting::int FROM pg_settings WHERE name = 'max_connections'")
+    )
+    value = result.scalar_one_or_none() or 100
+    _max_connections_cache = (value, now)
+    return value
+
+
 @traced()
 async def check_postgresql_health(db: AsyncSession) -> PostgreSQLHealth:
     """Check PostgreSQL database health status."""
-    host = settings.database_url.split("@")[-1].split("/")[0] if "@" in settings.database_url else "localhost"
+    host = _postgresql_host()
 
     try:
         start_time = time.time()
@@ -96,24 +197,19 @@ async def check_postgresql_health(db: AsyncSession) -> PostgreSQLHealth:
         await db.execute(text("SELECT 1"))
         response_time_ms = (time.time() - start_time) * 1000
 
-        # Get connection stats
+        # Get connection stats and database size in one round-trip
         result = await db.execute(text("""
             SELECT
                 numbackends as active_connections,
-                (SELECT setting::int FROM pg_settings WHERE name = 'max_connections') as max_connections
+                pg_database_size(current_database()) / 1024.0 / 1024.0 as size_mb
             FROM pg_stat_database
             WHERE datname = current_database()
         """))
         row = result.fetchone()
         active_connections = row[0] if row else 0
-        max_connections = row[1] if row else 100
+        database_size_mb = round(row[1], 2) if row else 0
 
-        # Get database size
-        size_result = await db.execute(text("""
-            SELECT pg_database_size(current_database()) / 1024.0 / 1024.0 as size_mb
-        """))
-        size_row = size_result.fetchone()
-        database_size_mb = round(size_row[0], 2) if size_row else 0
+        max_connections = await _get_max_connections(db)
 
         return PostgreSQLHealth(
             status=ServiceStatus.HEALTHY,
@@ -131,6 +227,17 @@ async def check_postgresql_health(db: AsyncSession) -> PostgreSQLHealth:
         )
 
 
+# Only the INFO sections the probe reads (multi-section INFO needs Redis 7+)
+REDIS_INFO_SECTIONS = ("memory", "clients", "stats")
+REDIS_INFO_FIELDS = (
+    "used_memory",
+    "maxmemory",
+    "connected_clients",
+    "keyspace_hits",
+    "keyspace_misses",
+)
+
+
 @traced()
 async def check_redis_health() -> RedisHealth:
     """Check Redis health status."""
@@ -140,33 +247,23 @@ async def check_redis_health() -> RedisHealth:
     try:
         start_time = time.time()
 
-        r = redis.Redis(
-            host=host,
-            port=port,
-            decode_responses=True,
-            socket_timeout=5.0,
-        )
-
-        # Test connection
-        await r.ping()
+        # Test connection and get Redis info in one round-trip
+        pipe = get_redis().pipeline(transaction=False)
+        pipe.ping()
+        pipe.info(*REDIS_INFO_SECTIONS)
+        _, info = await pipe.execute()
         response_time_ms = (time.time() - start_time) * 1000
 
-        # Get Redis info
-        info = await r.info()
-
-        used_memory_mb = round(info.get("used_memory", 0) / 1024 / 1024, 2)
-        max_memory = info.get("maxmemory", 0)
+        used_memory, max_memory, connected_clients, hits, misses = (
+            info.get(field, 0) for field in REDIS_INFO_FIELDS
+        )
+        used_memory_mb = round(used_memory / 1024 / 1024, 2)
         max_memory_mb = round(max_memory / 1024 / 1024, 2) if max_memory > 0 else 0
-        connected_clients = info.get("connected_clients", 0)
 
         # Calculate hit rate
-        hits = info.get("keyspace_hits", 0)
-        misses = info.get("keyspace_misses", 0)
         total = hits + misses
         hit_rate = round((hits / total * 100), 2) if total > 0 else 0
 
-        await r.aclose()
-
         return RedisHealth(
             status=ServiceStatus.HEALTHY,
             host=host,
@@ -200,19 +297,34 @@ async def check_redis_health() -> RedisHealth:
         )
 
 
+# Overall budget for get_system_health; slow probes are reported as unhealthy
+HEALTH_CHECK_TIMEOUT_SECONDS = 3.0
+HEALTH_CHECK_TIMEOUT_ERROR = "Health check timeout"
+
+def _probe_result[T](task: asyncio.Task[T], timed_out: T) -> T:
+    """Get a probe's result, or the fallback if the deadline cancelled it."""
+    if task.cancelled():
+        return timed_out
+    return task.result()
+
+
+_ALL_HEALTHY = frozenset({ServiceStatus.HEALTHY})
+
+
 def _determine_overall_status(
     litellm: LiteLLMHealth,
     postgresql: PostgreSQLHealth,
     redis_health: RedisHealth,
 ) -> ServiceStatus:
     """Determine overall system health status."""
-    statuses = [litellm.status, postgresql.status, redis_health.status]
+    # Distinct statuses, so each check below is a single set lookup
+    statuses = {litellm.status, postgresql.status, redis_health.status}
 
-    if all(s == ServiceStatus.HEALTHY for s in statuses):
+    if statuses == _ALL_HEALTHY:
         return ServiceStatus.HEALTHY
-    elif any(s == ServiceStatus.UNHEALTHY for s in statuses):
+    elif ServiceStatus.UNHEALTHY in statuses:
         return ServiceStatus.UNHEALTHY
-    elif any(s == ServiceStatus.DEGRADED for s in statuses):
+    elif ServiceStatus.DEGRADED in statuses:
         return ServiceStatus.DEGRADED
     else:
         return ServiceStatus.UNKNOWN
@@ -221,10 +333,41 @@ def _determine_overall_status(
 @traced()
 async def get_system_health(db: AsyncSession) -> SystemHealthResponse:
     """Get complete system health status."""
-    # Check all services
-    litellm = await check_litellm_health()
-    postgresql = await check_postgresql_health(db)
-    redis_health = await check_redis_health()
+    # Check all services concurrently under one shared deadline; each probe
+    # reports its own failures, so only the deadline needs handling here
+    try:
+        async with asyncio.timeout(HEALTH_CHECK_TIMEOUT_SECONDS), asyncio.TaskGroup() as tg:
+            litellm_task = tg.create_task(check_litellm_health())
+            postgresql_task = tg.create_task(check_postgresql_health(db))
+            redis_task = tg.create_task(check_redis_health())
+    except TimeoutError:
+        logger.warning(f"System health check exceeded {HEALTH_CHECK_TIMEOUT_SECONDS}s")
+
+    litellm = _probe_result(
+        litellm_task,
+        LiteLLMHealth(
+            status=ServiceStatus.UNHEALTHY,
+            url=settings.litellm_api_url,
+            error=HEALTH_CHECK_TIMEOUT_ERROR,
+        ),
+    )
+    postgresql = _probe_result(
+        postgresql_task,
+        PostgreSQLHealth(
+            status=ServiceStatus.UNHEALTHY,
+            host=_postgresql_host(),
+            error=HEALTH_CHECK_TIMEOUT_ERROR,
+        ),
+    )
+    redis_health = _probe_result(
+        redis_task,
+        RedisHealth(
+            status=ServiceStatus.UNHEALTHY,
+            host=settings.redis_host,
+            port=settings.redis_port,
+            error=HEALTH_CHECK_TIMEOUT_ERROR,
+        ),
+    )
 
     # Determine overall status
     overall_status = _determine_overall_status(litellm, postgresql, redis_health)
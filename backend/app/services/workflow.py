@@ -1,12 +1,16 @@
 """Workflow service for managing workflows and executions."""
 
+import asyncio
 import logging
 import uuid
 from datetime import UTC, datetime
 
-from sqlalchemy import func, select
+from pydantic import TypeAdapter
+from redis.exceptions import RedisError
+from sqlalchemy import false, func, insert, literal, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.redis_client import get_redis
 from app.core.telemetry import traced
 from app.models.workflow import (
     ExecutionStatus,
@@ -14,16 +18,47 @@ from app.models.workflow import (
     WorkflowExecution,
     WorkflowStatus,
 )
-from app.schemas.workflow import WorkflowCreate, WorkflowUpdate
+from app.schemas.workflow import (
+    WorkflowCreate,
+    WorkflowEdge,
+    WorkflowNode,
+    WorkflowUpdate,
+)
+from app.services.workflow_engine import (
+    WorkflowEngine,
+    WorkflowEngineStream,
+    compile_workflow,
+)
 
 logger = logging.getLogger(__name__)
 
+# Dump whole node/edge lists in one pydantic-core call instead of per item
+_NODES_ADAPTER = TypeAdapter(list[WorkflowNode])
+_EDGES_ADAPTER = TypeAdapter(list[WorkflowEdge])
+
 
 # =============================================================================
 # Workflow CRUD
 # =============================================================================
 
 
+async def _count_past_last_page(
+    db: AsyncSession,
+    model: type[Workflow] | type[WorkflowExecution],
+    filters: list,
+    offset: int,
+) -> int:
+    """
+    Count matching rows when a windowed page query returned nothing.
+
+    An empty first page means there are no rows; only a page past the end
+    needs a separate COUNT.
+    """
+    if not offset:
+        return 0
+    return await db.scalar(select(func.count()).select_from(model).where(*filters)) or 0
+
+
 @traced()
 async def create_workflow(
     db: AsyncSession,
@@ -45,8 +80,8 @@ async def create_workflow(
         user_id=user_id,
         name=data.name,
         description=data.description,
-        nodes=[node.model_dump() for node in data.nodes] if data.nodes else [],
-        edges=[edge.model_dump() for edge in data.edges] if data.edges else [],
+        nodes=_NODES_ADAPTER.dump_python(data.nodes) if data.nodes else [],
+        edges=_EDGES_ADAPTER.dump_python(data.edges) if data.edges else [],
         viewport=data.viewport.model_dump() if data.viewport else {},
         status=WorkflowStatus.draft.value,
         is_template=data.is_template,
@@ -54,7 +89,9 @@ async def create_workflow(
     )
     db.add(workflow)
     await db.flush()
-    await db.refresh(workflow)
+
+    # Compile the graph now so the first run reuses it
+    compile_workflow(workflow)
 
     logger.info(f"Created workflow {workflow.id} ({workflow.name}) for user {user_id}")
     return workflow
@@ -106,22 +143,25 @@ async def get_workflows(
     Returns:
         Tuple of (workflows list, total count)
     """
-    # Base query
-    base_query = select(Workflow).where(Workflow.user_id == user_id)
+    filters = [Workflow.user_id == user_id]
     if status:
-        base_query = base_query.where(Workflow.status == status.value)
-
-    # Count total
-    count_stmt = select(func.count()).select_from(base_query.subquery())
-    total = (await db.execute(count_stmt)).scalar() or 0
+        filters.append(Workflow.status == status.value)
 
-    # Get paginated
+    # Get paginated with the total counted by a window over the same scan
     offset = (page - 1) * page_size
-    stmt = base_query.order_by(Workflow.updated_at.desc()).offset(offset).limit(page_size)
-    result = await db.execute(stmt)
-    workflows = list(result.scalars().all())
+    stmt = (
+        select(Workflow, func.count().over().label("total"))
+        .where(*filters)
+        .order_by(Workflow.updated_at.desc())
+        .offset(offset)
+        .limit(page_size)
+    )
+    rows = (await db.execute(stmt)).all()
+    if rows:
+        return [row[0] for row in rows], rows[0].total
 
-    return workflows, total
+    total = await _count_past_last_page(db, Workflow, filters, offset)
+    return [], total
 
 
 @traced()
@@ -152,9 +192,9 @@ async def update_workflow(
     if data.description is not None:
         workflow.description = data.description
     if data.nodes is not None:
-        workflow.nodes = [node.model_dump() for node in data.nodes]
+        workflow.nodes = _NODES_ADAPTER.dump_python(data.nodes)
     if data.edges is not None:
-        workflow.edges = [edge.model_dump() for edge in data.edges]
+        workflow.edges = _EDGES_ADAPTER.dump_python(data.edges)
     if data.viewport is not None:
         workflow.viewport = data.viewport.model_dump()
     if data.status is not None:
@@ -165,7 +205,9 @@ async def update_workflow(
         workflow.config = data.config
 
     await db.flush()
-    await db.refresh(workflow)
+
+    # Compile the new revision now so the next run reuses it
+    compile_workflow(workflow)
 
     logger.info(f"Updated workflow {workflow_id}")
     return workflow
@@ -216,25 +258,44 @@ async def duplicate_workflow(
     Returns:
         New Workflow if original found, None otherwise
     """
-    original = await get_workflow(db, workflow_id, user_id)
-    if not original:
-        return None
-
-    # Create copy
-    workflow = Workflow(
-        user_id=user_id,
-        name=f"{original.name} (Copy)",
-        description=original.description,
-        nodes=original.nodes,
-        edges=original.edges,
-        viewport=original.viewport,
-        status=WorkflowStatus.draft.value,
-        is_template=False,
-        config=original.config,
+    # Copy server-side so the JSON columns never round-trip through Python
+    source = select(
+        literal(uuid.uuid4(), Workflow.id.type),
+        Workflow.user_id,
+        Workflow.name + " (Copy)",
+        Workflow.description,
+        Workflow.nodes,
+        Workflow.edges,
+        Workflow.viewport,
+        literal(WorkflowStatus.draft.value),
+        false(),
+        Workflow.config,
+    ).where(
+        Workflow.id == workflow_id,
+        Workflow.user_id == user_id,
     )
-    db.add(workflow)
-    await db.flush()
-    await db.refresh(workflow)
+    stmt = (
+        insert(Workflow)
+        .from_select(
+            [
+                "id",
+                "user_id",
+                "name",
+                "description",
+                "nodes",
+                "edges",
+                "viewport",
+                "status",
+                "is_template",
+                "config",
+            ],
+            source,
+        )
+        .returning(Workflow)
+    )
+    workflow = (await db.scalars(stmt)).one_or_none()
+    if not workflow:
+        return None
 
     logger.info(f"Duplicated workflow {workflow_id} to {workflow.id}")
     return workflow
@@ -245,6 +306,73 @@ async def duplicate_workflow(
 # =============================================================================
 
 
+# cancel_execution publishes here to stop an execution that is still running
+EXECUTION_CANCEL_CHANNEL_PREFIX = "workflow:cancel:"
+
+
+async def _cancel_on_signal(
+    execution_id: uuid.UUID,
+    cancel_requested: asyncio.Event,
+    task: asyncio.Task | None = None,
+) -> None:
+    """
+    Wait for a cancel signal for an execution and flag it.
+
+    Sets cancel_requested and, when given, cancels the task running the
+    execution. Runs until a signal arrives or the watcher is cancelled.
+    """
+    pubsub = get_redis().pubsub()
+    try:
+        await pubsub.subscribe(f"{EXECUTION_CANCEL_CHANNEL_PREFIX}{execution_id}")
+        while task is None or not task.done():
+            # Poll with a short timeout; a blocking read would hit the socket timeout
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            if message is not None:
+                cancel_requested.set()
+                if task is not None:
+                    task.cancel()
+                return
+    except RedisError as e:
+        logger.warning(f"Execution cancel signals unavailable: {e}")
+    finally:
+        await pubsub.aclose()
+
+
+async def _stop_watcher(watcher: asyncio.Task) -> None:
+    """Cancel a cancel-signal watcher and wait until its subscription is closed."""
+    watcher.cancel()
+    # asyncio.wait does not re-raise the watcher's CancelledError
+    await asyncio.wait([watcher])
+
+
+async def _start_execution(
+    db: AsyncSession,
+    workflow_id: uuid.UUID,
+    user_id: uuid.UUID,
+    inputs: dict,
+) -> WorkflowExecution:
+    """
+    Create a running execution and commit it.
+
+    The row is committed before the engine starts so cancel_execution,
+    which runs in another request's session, can find it.
+    """
+    execution = WorkflowExecution(
+        workflow_id=workflow_id,
+        user_id=user_id,
+        status=ExecutionStatus.running.value,
+        inputs=inputs,
+        outputs={},
+        logs=[],
+        started_at=datetime.now(UTC),
+    )
+    db.add(execution)
+    # Other services leave committing to get_db, but that only happens after
+    # the run ends; cancel_execution needs to see the row while it is running
+    await db.commit()
+    return execution
+
+
 @traced()
 async def execute_workflow(
     db: AsyncSession,
@@ -264,51 +392,45 @@ async def execute_workflow(
     Returns:
         WorkflowExecution instance
     """
-    from app.services.workflow_engine import WorkflowEngine
-
     # Get workflow
     workflow = await get_workflow(db, workflow_id, user_id)
     if not workflow:
         raise ValueError(f"Workflow not found: {workflow_id}")
 
-    # Create execution record
-    execution = WorkflowExecution(
-        workflow_id=workflow_id,
-        user_id=user_id,
-        status=ExecutionStatus.pending.value,
-        inputs=inputs,
-        outputs={},
-        node_states={},
-        logs=[],
-        started_at=datetime.now(UTC).isoformat(),
-    )
-    db.add(execution)
-    await db.flush()
-    await db.refresh(execution)
+    execution = await _start_execution(db, workflow_id, user_id, inputs)
 
-    # Execute workflow
+    # Execute workflow, stopping early if a cancel signal arrives
     engine = WorkflowEngine(workflow, execution, db)
+    cancel_requested = asyncio.Event()
+    run_task = asyncio.create_task(engine.execute(inputs))
+    cancel_watcher = asyncio.create_task(
+        _cancel_on_signal(execution.id, cancel_requested, run_task)
+    )
     try:
-        execution.status = ExecutionStatus.running.value
-        await db.flush()
-
-        result = await engine.execute(inputs)
+        result = await run_task
 
         execution.status = ExecutionStatus.completed.value
         execution.outputs = result.get("outputs", {})
-        execution.node_states = result.get("node_states", {})
         execution.logs = result.get("logs", [])
         execution.total_tokens = result.get("total_tokens", 0)
-        execution.completed_at = datetime.now(UTC).isoformat()
-
+        execution.completed_at = datetime.now(UTC)
+
+    except asyncio.CancelledError:
+        # Only a cancel signal is handled here; request cancellation propagates
+        if not cancel_requested.is_set():
+            raise
+        logger.info(f"Execution {execution.id} cancelled while running")
+        execution.status = ExecutionStatus.cancelled.value
+        execution.completed_at = datetime.now(UTC)
     except Exception as e:
         logger.error(f"Workflow execution failed: {e}")
         execution.status = ExecutionStatus.failed.value
         execution.error_message = str(e)
-        execution.completed_at = datetime.now(UTC).isoformat()
+        execution.completed_at = datetime.now(UTC)
+    finally:
+        await _stop_watcher(cancel_watcher)
 
     await db.flush()
-    await db.refresh(execution)
 
     return execution
 
@@ -359,23 +481,26 @@ async def get_workflow_executions(
     Returns:
         Tuple of (executions list, total count)
     """
-    # Base query
-    base_query = select(WorkflowExecution).where(
+    filters = [
         WorkflowExecution.workflow_id == workflow_id,
         WorkflowExecution.user_id == user_id,
-    )
+    ]
 
-    # Count total
-    count_stmt = select(func.count()).select_from(base_query.subquery())
-    total = (await db.execute(count_stmt)).scalar() or 0
-
-    # Get paginated
+    # Get paginated with the total counted by a window over the same scan
     offset = (page - 1) * page_size
-    stmt = base_query.order_by(WorkflowExecution.created_at.desc()).offset(offset).limit(page_size)
-    result = await db.execute(stmt)
-    executions = list(result.scalars().all())
+    stmt = (
+        select(WorkflowExecution, func.count().over().label("total"))
+        .where(*filters)
+        .order_by(WorkflowExecution.created_at.desc())
+        .offset(offset)
+        .limit(page_size)
+    )
+    rows = (await db.execute(stmt)).all()
+    if rows:
+        return [row[0] for row in rows], rows[0].total
 
-    return executions, total
+    total = await _count_past_last_page(db, WorkflowExecution, filters, offset)
+    return [], total
 
 
 @traced()
@@ -404,10 +529,15 @@ async def cancel_execution(
         return execution
 
     execution.status = ExecutionStatus.cancelled.value
-    execution.completed_at = datetime.now(UTC).isoformat()
+    execution.completed_at = datetime.now(UTC)
 
     await db.flush()
-    await db.refresh(execution)
+
+    # Stop the engine if the execution is still running in another request
+    try:
+        await get_redis().publish(f"{EXECUTION_CANCEL_CHANNEL_PREFIX}{execution_id}", "1")
+    except RedisError as e:
+        logger.warning(f"Failed to publish cancel signal for execution {execution_id}: {e}")
 
     logger.info(f"Cancelled execution {execution_id}")
     return execution
@@ -439,51 +569,48 @@ async def execute_workflow_stream(
     Yields:
         Dict events with content, node info, and done status
     """
-    from app.services.workflow_engine import WorkflowEngineStream
-
     # Get workflow
     workflow = await get_workflow(db, workflow_id, user_id)
     if not workflow:
         yield {"error": "Workflow not found", "done": True}
         return
 
-    # Create execution record
-    execution = WorkflowExecution(
-        workflow_id=workflow_id,
-        user_id=user_id,
-        status=ExecutionStatus.pending.value,
-        inputs=inputs,
-        outputs={},
-        node_states={},
-        logs=[],
-        started_at=datetime.now(UTC).isoformat(),
-    )
-    db.add(execution)
-    await db.flush()
-    await db.refresh(execution)
+    execution = await _start_execution(db, workflow_id, user_id, inputs)
 
-    # Execute with streaming
+    # Execute with streaming, stopping between events if a cancel signal arrives
     engine = WorkflowEngineStream(workflow, execution, db)
+    cancel_requested = asyncio.Event()
+    cancel_watcher = asyncio.create_task(_cancel_on_signal(execution.id, cancel_requested))
+    cancelled = False
     try:
-        execution.status = ExecutionStatus.running.value
-        await db.flush()
-
-        async for event in engine.execute_stream(inputs):
+        stream = engine.execute_stream(inputs)
+        async for event in stream:
+            if cancel_requested.is_set():
+                cancelled = True
+                await stream.aclose()
+                break
             yield event
 
-        # Update execution after completion
-        execution.status = ExecutionStatus.completed.value
-        execution.outputs = engine.state.get("node_outputs", {})
-        execution.node_states = engine.state.get("node_outputs", {})
-        execution.logs = engine.logs
-        execution.total_tokens = engine.total_tokens
-        execution.completed_at = datetime.now(UTC).isoformat()
+        if cancelled:
+            logger.info(f"Execution {execution.id} cancelled while streaming")
+            execution.status = ExecutionStatus.cancelled.value
+            execution.completed_at = datetime.now(UTC)
+            yield {"error": "Execution cancelled", "done": True}
+        else:
+            # Update execution after completion
+            execution.status = ExecutionStatus.completed.value
+            execution.outputs = engine.state.get("node_outputs", {})
+            execution.logs = engine.logs
+            execution.total_tokens = engine.total_tokens
+            execution.completed_at = datetime.now(UTC)
 
     except Exception as e:
         logger.error(f"Workflow streaming execution failed: {e}")
         execution.status = ExecutionStatus.failed.value
         execution.error_message = str(e)
-        execution.completed_at = datetime.now(UTC).isoformat()
+        execution.completed_at = datetime.now(UTC)
         yield {"error": str(e), "done": True}
+    finally:
+        await _stop_watcher(cancel_watcher)
 
     await db.flush()
@@ -1,28 +1,143 @@
 """Workflow execution engine."""
 
+import hashlib
+import json
 import logging
+import re
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
 from datetime import UTC, datetime
+from functools import lru_cache
+from types import CodeType
 from typing import Any
 
+import httpx
+from redis.exceptions import RedisError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.agents.engine import AgentEngine
+from app.config import settings
+from app.core.redis_client import get_redis
 from app.models.workflow import Workflow, WorkflowExecution
 from app.providers.llm import ChatMessage, llm_client
 
 logger = logging.getLogger(__name__)
 
 
+# =============================================================================
+# Template Rendering
+# =============================================================================
+
+
+# {{key}} reads an input, {{nodes.<id>}} reads a node output; keys may hold any
+# characters, as input names are user-defined
+_TEMPLATE_VARIABLE_PATTERN = re.compile(r"\{\{\s*(.+?)\s*\}\}")
+_NODE_VARIABLE_PREFIX = "nodes."
+
+
+def render_template(template: str, state: dict) -> str:
+    """
+    Render template variables with workflow state in a single pass.
+
+    Unknown variables are left in place.
+
+    Args:
+        template: Template containing {{key}} or {{nodes.<id>}} variables
+        state: Current workflow state
+
+    Returns:
+        Rendered string
+    """
+    if "{{" not in template:
+        return template
+
+    inputs = state.get("inputs", {})
+    node_outputs = state.get("node_outputs", {})
+
+    def replace(match: re.Match[str]) -> str:
+        name = match.group(1)
+        # Inputs take precedence over node outputs of the same name
+        if name in inputs:
+            return str(inputs[name])
+        node_id = name.removeprefix(_NODE_VARIABLE_PREFIX)
+        if node_id != name and node_id in node_outputs:
+            output = node_outputs[node_id]
+            if isinstance(output, dict) and "output" in output:
+                output = output["output"]
+            return str(output)
+        return match.group(0)
+
+    return _TEMPLATE_VARIABLE_PATTERN.sub(replace, template)
+
+
+# =============================================================================
+# State Access
+# =============================================================================
+
+
+@lru_cache(maxsize=2048)
+def _split_path(path: str) -> tuple[str, ...]:
+    """Split a dot-notation path once per distinct path."""
+    return tuple(path.split("."))
+
+
+def get_value_from_path(path: str, state: dict) -> Any:
+    """
+    Get a value from workflow state by dot-notation path.
+
+    Args:
+        path: Path such as "inputs.query" or "node_outputs.rag-1.output"
+        state: Current workflow state
+
+    Returns:
+        The value, or None if any part of the path is missing
+    """
+    current = state
+    for part in _split_path(path):
+        if isinstance(current, dict) and part in current:
+            current = current[part]
+        else:
+            return None
+    return current
+
+
 # =============================================================================
 # Base Node Executor
 # =============================================================================
 
 
 class BaseNodeExecutor(ABC):
-    """Base class for node executors."""
+    """
+    Base class for node executors.
+
+    One instance per node type is shared by every run, so executors must not
+    keep per-run data on self; anything a run needs lives in ``state``.
+    """
 
     node_type: str = "base"
 
+    # Seconds a result of a node with "cache": true is reused across runs;
+    # 0 disables it
+    cache_ttl: int = 0
+
+    # Whether identical nodes later in the same run reuse the first result
+    memoize_in_run: bool = True
+
+    def cache_key_data(self, node_config: dict, state: dict) -> dict | None:
+        """
+        Get the resolved inputs that determine this node's result.
+
+        Args:
+            node_config: Node configuration from the workflow
+            state: Current workflow state
+
+        Returns:
+            JSON-serializable inputs, or None if the result must not be reused
+        """
+        return None
+
     @abstractmethod
     async def execute(
         self,
@@ -82,6 +197,22 @@ class LLMNodeExecutor(BaseNodeExecutor):
     """LLM node - call LiteLLM for text generation."""
 
     node_type = "llm"
+    cache_ttl = 3600
+
+    def cache_key_data(self, node_config: dict, state: dict) -> dict | None:
+        """Key on the rendered prompt and model settings; sampled output is never reused."""
+        config = node_config.get("config", {})
+        # UI JSON may send null or a string; only a numeric 0 is repeatable
+        temperature = config.get("temperature", 0.7)
+        if not isinstance(temperature, int | float) or temperature > 0:
+            return None
+        return {
+            "prompt": render_template(config.get("prompt", ""), state),
+            "model": config.get("model", "gemini-2.0-flash"),
+            "temperature": config.get("temperature", 0.7),
+            "max_tokens": config.get("max_tokens"),
+            "system_prompt": config.get("system_prompt"),
+        }
 
     async def execute(self, node_config: dict, state: dict, db: AsyncSession) -> dict:
         """Execute LLM call."""
@@ -89,7 +220,7 @@ class LLMNodeExecutor(BaseNodeExecutor):
 
         # Get prompt template and render with state
         prompt_template = config.get("prompt", "")
-        prompt = self._render_template(prompt_template, state)
+        prompt = render_template(prompt_template, state)
 
         # Get model settings
         model = config.get("model", "gemini-2.0-flash")
@@ -116,31 +247,21 @@ class LLMNodeExecutor(BaseNodeExecutor):
             "tokens_used": response.usage.get("total_tokens", 0) if response.usage else 0,
         }
 
-    def _render_template(self, template: str, state: dict) -> str:
-        """Render template with state variables."""
-        result = template
-        # Replace {{variable}} patterns
-        node_outputs = state.get("node_outputs", {})
-        inputs = state.get("inputs", {})
-
-        # Replace input variables
-        for key, value in inputs.items():
-            result = result.replace(f"{{{{{key}}}}}", str(value))
-
-        # Replace node output variables
-        for node_id, output in node_outputs.items():
-            if isinstance(output, dict) and "output" in output:
-                result = result.replace(f"{{{{nodes.{node_id}}}}}", str(output["output"]))
-            else:
-                result = result.replace(f"{{{{nodes.{node_id}}}}}", str(output))
-
-        return result
-
 
 class RAGNodeExecutor(BaseNodeExecutor):
     """RAG node - search documents."""
 
     node_type = "rag"
+    cache_ttl = 300
+
+    def cache_key_data(self, node_config: dict, state: dict) -> dict | None:
+        """Key on the resolved query and search params."""
+        config = node_config.get("config", {})
+        return {
+            "query": self._get_query(config, state),
+            "top_k": config.get("top_k", 5),
+            "document_ids": config.get("document_ids", []),
+        }
 
     async def execute(self, node_config: dict, state: dict, db: AsyncSession) -> dict:
         """Execute RAG search."""
@@ -149,10 +270,7 @@ class RAGNodeExecutor(BaseNodeExecutor):
         config = node_config.get("config", {})
 
         # Get query
-        query_from = config.get("query_from", "inputs.query")
-        query = self._get_value_from_path(query_from, state)
-        if not query:
-            query = config.get("query", "")
+        query = self._get_query(config, state)
 
         # Get search params
         top_k = config.get("top_k", 5)
@@ -183,16 +301,10 @@ class RAGNodeExecutor(BaseNodeExecutor):
             "chunk_count": len(results),
         }
 
-    def _get_value_from_path(self, path: str, state: dict) -> Any:
-        """Get value from dot-notation path."""
-        parts = path.split(".")
-        current = state
-        for part in parts:
-            if isinstance(current, dict) and part in current:
-                current = current[part]
-            else:
-                return None
-        return current
+    def _get_query(self, config: dict, state: dict) -> Any:
+        """Get the search query from state, falling back to the configured query."""
+        query_from = config.get("query_from", "inputs.query")
+        return get_value_from_path(query_from, state) or config.get("query", "")
 
 
 class AgentNodeExecutor(BaseNodeExecutor):
@@ -202,8 +314,6 @@ class AgentNodeExecutor(BaseNodeExecutor):
 
     async def execute(self, node_config: dict, state: dict, db: AsyncSession) -> dict:
         """Execute agent."""
-        from app.agents.engine import AgentEngine
-
         config = node_config.get("config", {})
 
         # Get agent slug
@@ -211,7 +321,7 @@ class AgentNodeExecutor(BaseNodeExecutor):
 
         # Get input
         input_from = config.get("input_from", "inputs.query")
-        user_input = self._get_value_from_path(input_from, state)
+        user_input = get_value_from_path(input_from, state)
         if not user_input:
             user_input = config.get("input", "")
 
@@ -219,7 +329,7 @@ class AgentNodeExecutor(BaseNodeExecutor):
         context_from = config.get("context_from")
         context = None
         if context_from:
-            context = self._get_value_from_path(context_from, state)
+            context = get_value_from_path(context_from, state)
 
         # Build messages
         messages = []
@@ -243,16 +353,57 @@ class AgentNodeExecutor(BaseNodeExecutor):
             "tokens_used": result.get("tokens_used", 0),
         }
 
-    def _get_value_from_path(self, path: str, state: dict) -> Any:
-        """Get value from dot-notation path."""
-        parts = path.split(".")
-        current = state
-        for part in parts:
-            if isinstance(current, dict) and part in current:
-                current = current[part]
-            else:
-                return None
-        return current
+
+ConditionEvaluator = Callable[[Any], bool]
+
+
+def _to_float(value: Any) -> float | None:
+    """Convert a value to float, or None if it is not numeric."""
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def _build_evaluator(operator: str, compare_value: Any) -> ConditionEvaluator:
+    """Build a condition check with the compare value coerced up front."""
+    if operator in ("greater_than", "less_than"):
+        compare_number = _to_float(compare_value)
+        if compare_number is None:
+            return lambda value: False
+        if operator == "greater_than":
+            return lambda value: (number := _to_float(value)) is not None and number > compare_number
+        return lambda value: (number := _to_float(value)) is not None and number < compare_number
+
+    compare_text = str(compare_value)
+    if operator == "equals":
+        return lambda value: str(value) == compare_text
+    elif operator == "not_equals":
+        return lambda value: str(value) != compare_text
+    elif operator == "contains":
+        return lambda value: compare_text in str(value)
+    elif operator == "not_contains":
+        return lambda value: compare_text not in str(value)
+    elif operator == "is_empty":
+        return lambda value: not value
+    elif operator == "is_not_empty":
+        return lambda value: bool(value)
+    return lambda value: False
+
+
+@lru_cache(maxsize=4096, typed=True)
+def _get_cached_evaluator(operator: str, compare_value: Any) -> ConditionEvaluator:
+    """Get the condition check for a hashable compare value."""
+    return _build_evaluator(operator, compare_value)
+
+
+def _get_evaluator(operator: str, compare_value: Any) -> ConditionEvaluator:
+    """Get the condition check for an operator and compare value."""
+    try:
+        return _get_cached_evaluator(operator, compare_value)
+    except TypeError:
+        # Unhashable compare values (lists, dicts) are rare; build uncached
+        return _build_evaluator(operator, compare_value)
 
 
 class ConditionNodeExecutor(BaseNodeExecutor):
@@ -266,57 +417,20 @@ class ConditionNodeExecutor(BaseNodeExecutor):
 
         # Get value to check
         variable = config.get("variable", "")
-        value = self._get_value_from_path(variable, state)
+        value = get_value_from_path(variable, state)
 
         # Get operator and compare value
         operator = config.get("operator", "equals")
         compare_value = config.get("value", "")
 
         # Evaluate condition
-        result = self._evaluate(value, operator, compare_value)
+        result = _get_evaluator(operator, compare_value)(value)
 
         return {
             "output": result,
             "branch": "true" if result else "false",
         }
 
-    def _get_value_from_path(self, path: str, state: dict) -> Any:
-        """Get value from dot-notation path."""
-        parts = path.split(".")
-        current = state
-        for part in parts:
-            if isinstance(current, dict) and part in current:
-                current = current[part]
-            else:
-                return None
-        return current
-
-    def _evaluate(self, value: Any, operator: str, compare_value: Any) -> bool:
-        """Evaluate condition."""
-        if operator == "equals":
-            return str(value) == str(compare_value)
-        elif operator == "not_equals":
-            return str(value) != str(compare_value)
-        elif operator == "contains":
-            return str(compare_value) in str(value)
-        elif operator == "not_contains":
-            return str(compare_value) not in str(value)
-        elif operator == "greater_than":
-            try:
-                return float(value) > float(compare_value)
-            except (ValueError, TypeError):
-                return False
-        elif operator == "less_than":
-            try:
-                return float(value) < float(compare_value)
-            except (ValueError, TypeError):
-                return False
-        elif operator == "is_empty":
-            return not value
-        elif operator == "is_not_empty":
-            return bool(value)
-        return False
-
 
 class LoopNodeExecutor(BaseNodeExecutor):
     """Loop node - iterate over items."""
@@ -329,7 +443,7 @@ class LoopNodeExecutor(BaseNodeExecutor):
 
         # Get array to iterate
         array_from = config.get("array_from", "")
-        array = self._get_value_from_path(array_from, state)
+        array = get_value_from_path(array_from, state)
 
         if not isinstance(array, list):
             return {"output": [], "items": [], "count": 0}
@@ -353,55 +467,85 @@ class LoopNodeExecutor(BaseNodeExecutor):
             "count": len(array),
         }
 
-    def _get_value_from_path(self, path: str, state: dict) -> Any:
-        """Get value from dot-notation path."""
-        parts = path.split(".")
-        current = state
-        for part in parts:
-            if isinstance(current, dict) and part in current:
-                current = current[part]
-            else:
-                return None
-        return current
+
+# Shared HTTP client so HTTP nodes reuse pooled connections
+_http_node_client: httpx.AsyncClient | None = None
+
+HTTP_NODE_METHODS = frozenset({"GET", "POST", "PUT", "DELETE"})
+
+
+def _get_http_node_client() -> httpx.AsyncClient:
+    """Get or create the HTTP client used by HTTP nodes."""
+    global _http_node_client
+
+    if _http_node_client is None:
+        _http_node_client = httpx.AsyncClient(
+            timeout=30.0,
+            limits=httpx.Limits(max_keepalive_connections=100, max_connections=200),
+        )
+
+    return _http_node_client
+
+
+async def close_workflow_clients() -> None:
+    """Close shared workflow node clients. Called on application shutdown."""
+    global _http_node_client
+
+    if _http_node_client is not None:
+        await _http_node_client.aclose()
+        _http_node_client = None
 
 
 class HTTPNodeExecutor(BaseNodeExecutor):
     """HTTP node - call external APIs."""
 
     node_type = "http"
+    # Remote responses can change between calls, unless the node opts into caching
+    memoize_in_run = False
+
+    @property
+    def cache_ttl(self) -> int:
+        """Cache GET results for the configured TTL."""
+        return settings.workflow_http_cache_ttl
+
+    def cache_key_data(self, node_config: dict, state: dict) -> dict | None:
+        """Key GET requests on the rendered URL and headers; other methods have side effects."""
+        config = node_config.get("config", {})
+        if config.get("method", "GET").upper() != "GET":
+            return None
+        return {
+            "url": render_template(config.get("url", ""), state),
+            "headers": config.get("headers", {}),
+        }
 
     async def execute(self, node_config: dict, state: dict, db: AsyncSession) -> dict:
         """Execute HTTP request."""
-        import httpx
-
         config = node_config.get("config", {})
 
         method = config.get("method", "GET").upper()
-        url = self._render_template(config.get("url", ""), state)
+        url = render_template(config.get("url", ""), state)
         headers = config.get("headers", {})
         body = config.get("body")
 
         if body:
-            body = self._render_template(str(body), state)
+            body = render_template(str(body), state)
 
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                if method == "GET":
-                    response = await client.get(url, headers=headers)
-                elif method == "POST":
-                    response = await client.post(url, headers=headers, json=body if body else None)
-                elif method == "PUT":
-                    response = await client.put(url, headers=headers, json=body if body else None)
-                elif method == "DELETE":
-                    response = await client.delete(url, headers=headers)
-                else:
-                    raise ValueError(f"Unsupported HTTP method: {method}")
-
-                return {
-                    "output": response.text,
-                    "status_code": response.status_code,
-                    "headers": dict(response.headers),
-                }
+            if method not in HTTP_NODE_METHODS:
+                raise ValueError(f"Unsupported HTTP method: {method}")
+
+            response = await _get_http_node_client().request(
+                method,
+                url,
+                headers=headers,
+                json=body if body and method in ("POST", "PUT") else None,
+            )
+
+            return {
+                "output": response.text,
+                "status_code": response.status_code,
+                "headers": dict(response.headers),
+            }
         except Exception as e:
             return {
                 "output": None,
@@ -409,20 +553,11 @@ class HTTPNodeExecutor(BaseNodeExecutor):
                 "status_code": 0,
             }
 
-    def _render_template(self, template: str, state: dict) -> str:
-        """Render template with state variables."""
-        result = template
-        node_outputs = state.get("node_outputs", {})
-        inputs = state.get("inputs", {})
 
-        for key, value in inputs.items():
-            result = result.replace(f"{{{{{key}}}}}", str(value))
-
-        for node_id, output in node_outputs.items():
-            if isinstance(output, dict) and "output" in output:
-                result = result.replace(f"{{{{nodes.{node_id}}}}}", str(output["output"]))
-
-        return result
+@lru_cache(maxsize=1024)
+def _compile_function_code(code: str) -> CodeType:
+    """Compile custom function source once per distinct code string."""
+    return compile(code, "<custom_function>", "exec")
 
 
 class CustomFunctionNodeExecutor(BaseNodeExecutor):
@@ -431,7 +566,7 @@ class CustomFunctionNodeExecutor(BaseNodeExecutor):
     node_type = "custom_function"
 
     async def execute(self, node_config: dict, state: dict, db: AsyncSession) -> dict:
-        """Execute custom Python code (sandboxed)."""
+        """Execute custom Python code with full builtins; this is not a sandbox."""
         config = node_config.get("config", {})
         code = config.get("code", "")
 
@@ -439,8 +574,8 @@ class CustomFunctionNodeExecutor(BaseNodeExecutor):
         inputs = state.get("inputs", {})
         node_outputs = state.get("node_outputs", {})
 
-        # Build safe globals
-        safe_globals = {
+        # Build execution globals
+        exec_globals = {
             "inputs": inputs,
             "nodes": node_outputs,
             "result": None,
@@ -448,8 +583,8 @@ class CustomFunctionNodeExecutor(BaseNodeExecutor):
 
         # Execute code
         try:
-            exec(code, safe_globals)
-            return {"output": safe_globals.get("result")}
+            exec(_compile_function_code(code), exec_globals)
+            return {"output": exec_globals.get("result")}
         except Exception as e:
             return {"output": None, "error": str(e)}
 
@@ -459,19 +594,133 @@ class CustomFunctionNodeExecutor(BaseNodeExecutor):
 # =============================================================================
 
 
-NODE_EXECUTORS: dict[str, type[BaseNodeExecutor]] = {
-    "start": StartNodeExecutor,
-    "end": EndNodeExecutor,
-    "llm": LLMNodeExecutor,
-    "rag": RAGNodeExecutor,
-    "agent": AgentNodeExecutor,
-    "condition": ConditionNodeExecutor,
-    "loop": LoopNodeExecutor,
-    "http": HTTPNodeExecutor,
-    "custom_function": CustomFunctionNodeExecutor,
+# Executors are stateless, so one shared instance per node type
+NODE_EXECUTORS: dict[str, BaseNodeExecutor] = {
+    executor_class.node_type: executor_class()
+    for executor_class in (
+        StartNodeExecutor,
+        EndNodeExecutor,
+        LLMNodeExecutor,
+        RAGNodeExecutor,
+        AgentNodeExecutor,
+        ConditionNodeExecutor,
+        LoopNodeExecutor,
+        HTTPNodeExecutor,
+        CustomFunctionNodeExecutor,
+    )
 }
 
 
+# =============================================================================
+# Node Result Cache
+# =============================================================================
+
+
+NODE_CACHE_KEY_PREFIX = "workflow:node:"
+
+
+async def _get_cached_node_result(cache_key: str) -> dict | None:
+    """Get a memoized node result from Redis, or None on a miss or Redis error."""
+    try:
+        cached = await get_redis().get(cache_key)
+    except RedisError as e:
+        logger.warning(f"Workflow node cache unavailable: {e}")
+        return None
+    return json.loads(cached) if cached else None
+
+
+async def _cache_node_result(cache_key: str, result: dict, ttl: int) -> None:
+    """Memoize a node result in Redis."""
+    try:
+        await get_redis().set(cache_key, json.dumps(result, default=str), ex=ttl)
+    except (RedisError, TypeError, ValueError) as e:
+        logger.warning(f"Failed to cache workflow node result: {e}")
+
+
+# =============================================================================
+# Compiled Workflow
+# =============================================================================
+
+
+@dataclass
+class CompiledWorkflow:
+    """Workflow graph indexed once for traversal."""
+
+    start_node: dict | None
+    nodes_by_id: dict[str, dict]
+    adjacency: dict[str, list[str]]
+    branch_targets: dict[str, dict[str, str]]
+
+
+# Compiled graphs keyed by (workflow id, updated_at); any edit bumps updated_at
+COMPILED_WORKFLOW_CACHE_SIZE = 256
+_compiled_workflows: OrderedDict[tuple, CompiledWorkflow] = OrderedDict()
+
+
+def _build_compiled_workflow(nodes: list, edges: list) -> CompiledWorkflow:
+    """Index workflow nodes and edges for traversal."""
+    nodes_by_id: dict[str, dict] = {}
+    start_node = None
+    for node in nodes:
+        nodes_by_id.setdefault(node.get("id"), node)
+        if start_node is None and node.get("data", {}).get("type", "") == "start":
+            start_node = node
+    if start_node is None and nodes:
+        start_node = nodes[0]
+
+    adjacency: dict[str, list[str]] = {}
+    branch_targets: dict[str, dict[str, str]] = {}
+    for edge in edges:
+        adjacency.setdefault(edge.get("source", ""), []).append(edge.get("target", ""))
+
+        # First edge per branch wins; unlabeled edges count as the true branch
+        target = edge.get("target")
+        if target not in nodes_by_id:
+            continue
+        edge_label = (edge.get("label") or "").lower()
+        source_handle = (edge.get("sourceHandle") or "").lower()
+        branches = branch_targets.setdefault(edge.get("source"), {})
+        if edge_label == "true" or source_handle == "true" or not edge_label:
+            branches.setdefault("true", target)
+        if edge_label == "false" or source_handle == "false":
+            branches.setdefault("false", target)
+
+    return CompiledWorkflow(
+        start_node=start_node,
+        nodes_by_id=nodes_by_id,
+        adjacency=adjacency,
+        branch_targets=branch_targets,
+    )
+
+
+def compile_workflow(workflow: Workflow) -> CompiledWorkflow:
+    """
+    Get the compiled graph for a workflow, reusing it until the workflow changes.
+
+    Args:
+        workflow: Workflow to compile
+
+    Returns:
+        CompiledWorkflow for the workflow's current revision
+    """
+    nodes = workflow.nodes or []
+    edges = workflow.edges or []
+    if workflow.updated_at is None:
+        return _build_compiled_workflow(nodes, edges)
+
+    key = (workflow.id, workflow.updated_at)
+    compiled = _compiled_workflows.get(key)
+    if compiled is not None:
+        _compiled_workflows.move_to_end(key)
+        return compiled
+
+    compiled = _build_compiled_workflow(nodes, edges)
+    _compiled_workflows[key] = compiled
+    if len(_compiled_workflows) > COMPILED_WORKFLOW_CACHE_SIZE:
+        _compiled_workflows.popitem(last=False)
+    return compiled
+
+
 # =============================================================================
 # Workflow Engine
 # =============================================================================
@@ -490,8 +739,7 @@ class LLMNodeExecutorStream(BaseNodeExecutor):
     ) -> dict:
         """Non-streaming execute (required by base class)."""
         # Use non-streaming executor
-        executor = LLMNodeExecutor()
-        return await executor.execute(node_config, state, db)
+        return await NODE_EXECUTORS["llm"].execute(node_config, state, db)
 
     async def execute_stream(
         self,
@@ -504,7 +752,7 @@ class LLMNodeExecutorStream(BaseNodeExecutor):
 
         # Get prompt template and render with state
         prompt_template = config.get("prompt", "")
-        prompt = self._render_template(prompt_template, state)
+        prompt = render_template(prompt_template, state)
 
         # Get model settings
         model = config.get("model", "gemini-2.0-flash")
@@ -534,22 +782,8 @@ class LLMNodeExecutorStream(BaseNodeExecutor):
             "done": True,
         }
 
-    def _render_template(self, template: str, state: dict) -> str:
-        """Render template with state variables."""
-        result = template
-        node_outputs = state.get("node_outputs", {})
-        inputs = state.get("inputs", {})
-
-        for key, value in inputs.items():
-            result = result.replace(f"{{{{{key}}}}}", str(value))
-
-        for node_id, output in node_outputs.items():
-            if isinstance(output, dict) and "output" in output:
-                result = result.replace(f"{{{{nodes.{node_id}}}}}", str(output["output"]))
-            else:
-                result = result.replace(f"{{{{nodes.{node_id}}}}}", str(output))
 
-        return result
+_llm_stream_executor = LLMNodeExecutorStream()
 
 
 class WorkflowEngine:
@@ -571,6 +805,8 @@ class WorkflowEngine:
         }
         self.logs: list[dict] = []
         self.total_tokens: int = 0
+        # Node results already produced in this run, by node cache key
+        self._memo: dict[str, dict] = {}
 
     async def execute(self, inputs: dict) -> dict:
         """
@@ -580,25 +816,20 @@ class WorkflowEngine:
             inputs: Workflow inputs
 
         Returns:
-            Execution result with outputs, node_states, and logs
+            Execution result with outputs, logs, and total_tokens
         """
         self.state["inputs"] = inputs
-        nodes = self.workflow.nodes or []
-        edges = self.workflow.edges or []
+        compiled = compile_workflow(self.workflow)
 
-        if not nodes:
+        if not compiled.nodes_by_id:
             return {
                 "outputs": {},
-                "node_states": {},
                 "logs": [],
                 "total_tokens": 0,
             }
 
-        # Build adjacency map for traversal
-        adjacency = self._build_adjacency(edges)
-
         # Find start node
-        start_node = self._find_start_node(nodes)
+        start_node = compiled.start_node
         if not start_node:
             raise ValueError("No start node found in workflow")
 
@@ -629,17 +860,16 @@ class WorkflowEngine:
             elif node_type == "condition":
                 # Condition node - branch based on result
                 branch = result.get("branch", "true")
-                next_node = self._get_next_node_for_branch(node_id, branch, edges, nodes)
+                next_node = self._get_next_node_for_branch(node_id, branch, compiled)
             else:
                 # Normal node - follow edges
-                next_node = self._get_next_node(node_id, adjacency, nodes)
+                next_node = self._get_next_node(node_id, compiled)
 
             current_node = next_node
 
         # Return final outputs
         return {
             "outputs": self.state["node_outputs"],
-            "node_states": self.state["node_outputs"],
             "logs": self.logs,
             "total_tokens": self.total_tokens,
         }
@@ -652,13 +882,11 @@ class WorkflowEngine:
         node_config = node_data.get("config", {})
 
         # Get executor
-        executor_class = NODE_EXECUTORS.get(node_type)
-        if not executor_class:
+        executor = NODE_EXECUTORS.get(node_type)
+        if not executor:
             logger.warning(f"Unknown node type: {node_type}")
             return {"output": None, "error": f"Unknown node type: {node_type}"}
 
-        executor = executor_class()
-
         # Log start
         log_entry = {
             "node_id": node_id,
@@ -668,15 +896,36 @@ class WorkflowEngine:
         }
 
         try:
-            # Execute
-            result = await executor.execute(
-                {"id": node_id, "config": node_config},
-                self.state,
-                self.db,
-            )
+            # Reuse a memoized result for identical inputs
+            shared = self._uses_shared_cache(executor, node_config)
+            cache_key = None
+            if executor.memoize_in_run or shared:
+                cache_key = self._node_cache_key(executor, node_type, node_id, node_config)
+            result = None
+            if cache_key:
+                result = self._memo.get(cache_key)
+                if result is None and shared:
+                    result = await _get_cached_node_result(cache_key)
+                    if result is not None:
+                        self._memo[cache_key] = result
+
+            if result is not None:
+                tokens_used = 0
+                log_entry["cached"] = True
+            else:
+                # Execute
+                result = await executor.execute(
+                    {"id": node_id, "config": node_config},
+                    self.state,
+                    self.db,
+                )
+                tokens_used = result.get("tokens_used", 0)
+                if cache_key and "error" not in result:
+                    self._memo[cache_key] = result
+                    if shared:
+                        await _cache_node_result(cache_key, result, executor.cache_ttl)
 
             # Update tokens
-            tokens_used = result.get("tokens_used", 0)
             self.total_tokens += tokens_used
 
             # Log completion
@@ -696,63 +945,56 @@ class WorkflowEngine:
             self.logs.append(log_entry)
             return {"output": None, "error": str(e)}
 
-    def _build_adjacency(self, edges: list) -> dict[str, list[str]]:
-        """Build adjacency map from edges."""
-        adjacency: dict[str, list[str]] = {}
-        for edge in edges:
-            source = edge.get("source", "")
-            target = edge.get("target", "")
-            if source not in adjacency:
-                adjacency[source] = []
-            adjacency[source].append(target)
-        return adjacency
-
-    def _find_start_node(self, nodes: list) -> dict | None:
-        """Find the start node."""
-        for node in nodes:
-            node_type = node.get("data", {}).get("type", "")
-            if node_type == "start":
-                return node
-        return nodes[0] if nodes else None
-
-    def _get_next_node(
+    @staticmethod
+    def _uses_shared_cache(executor: BaseNodeExecutor, node_config: dict) -> bool:
+        """Check if a node's results are shared across runs through Redis."""
+        return (
+            settings.workflow_node_cache_enabled
+            and executor.cache_ttl > 0
+            and node_config.get("cache") is True
+        )
+
+    def _node_cache_key(
         self,
-        current_id: str,
-        adjacency: dict[str, list[str]],
-        nodes: list,
-    ) -> dict | None:
+        executor: BaseNodeExecutor,
+        node_type: str,
+        node_id: str,
+        node_config: dict,
+    ) -> str | None:
+        """Build the memoization key for a node, or None if it must run."""
+        key_data = executor.cache_key_data({"id": node_id, "config": node_config}, self.state)
+        if key_data is None:
+            return None
+
+        # Scoped per user so results over private documents are never shared
+        payload = json.dumps(
+            {"type": node_type, "user_id": str(self.execution.user_id), "inputs": key_data},
+            sort_keys=True,
+            default=str,
+        )
+        digest = hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+        return f"{NODE_CACHE_KEY_PREFIX}{digest}"
+
+    def _get_next_node(self, current_id: str, compiled: CompiledWorkflow) -> dict | None:
         """Get the next node to execute."""
-        targets = adjacency.get(current_id, [])
+        targets = compiled.adjacency.get(current_id, [])
         if not targets:
             return None
 
-        target_id = targets[0]  # Take first target for non-branching nodes
-        for node in nodes:
-            if node.get("id") == target_id:
-                return node
-        return None
+        # Take first target for non-branching nodes
+        return compiled.nodes_by_id.get(targets[0])
 
     def _get_next_node_for_branch(
         self,
         source_id: str,
         branch: str,
-        edges: list,
-        nodes: list,
+        compiled: CompiledWorkflow,
     ) -> dict | None:
         """Get next node for condition branch."""
-        for edge in edges:
-            if edge.get("source") == source_id:
-                # Check if edge has label matching branch
-                edge_label = edge.get("label", "").lower()
-                source_handle = edge.get("sourceHandle", "").lower()
-
-                if branch == "true" and (edge_label == "true" or source_handle == "true" or not edge_label) or branch == "false" and (edge_label == "false" or source_handle == "false"):
-                    target_id = edge.get("target")
-                    for node in nodes:
-                        if node.get("id") == target_id:
-                            return node
-
-        return None
+        target_id = compiled.branch_targets.get(source_id, {}).get(branch)
+        if target_id is None:
+            return None
+        return compiled.nodes_by_id[target_id]
 
 
 class WorkflowEngineStream(WorkflowEngine):
@@ -769,18 +1011,14 @@ class WorkflowEngineStream(WorkflowEngine):
             Dict events with content, node info, and done status
         """
         self.state["inputs"] = inputs
-        nodes = self.workflow.nodes or []
-        edges = self.workflow.edges or []
+        compiled = compile_workflow(self.workflow)
 
-        if not nodes:
+        if not compiled.nodes_by_id:
             yield {"content": "", "done": True, "outputs": {}}
             return
 
-        # Build adjacency map for traversal
-        adjacency = self._build_adjacency(edges)
-
         # Find start node
-        start_node = self._find_start_node(nodes)
+        start_node = compiled.start_node
         if not start_node:
             yield {"error": "No start node found in workflow", "done": True}
             return
@@ -825,9 +1063,9 @@ class WorkflowEngineStream(WorkflowEngine):
             elif node_type == "condition":
                 result = self.state["node_outputs"].get(node_id, {})
                 branch = result.get("branch", "true")
-                next_node = self._get_next_node_for_branch(node_id, branch, edges, nodes)
+                next_node = self._get_next_node_for_branch(node_id, branch, compiled)
             else:
-                next_node = self._get_next_node(node_id, adjacency, nodes)
+                next_node = self._get_next_node(node_id, compiled)
 
             current_node = next_node
 
@@ -844,8 +1082,7 @@ class WorkflowEngineStream(WorkflowEngine):
         node_data = node.get("data", {})
         node_config = node_data.get("config", {})
 
-        executor = LLMNodeExecutorStream()
-        async for event in executor.execute_stream(
+        async for event in _llm_stream_executor.execute_stream(
             {"id": node_id, "config": node_config},
             self.state,
             self.db,
@@ -1,10 +1,12 @@
 import os
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from httpx import ASGITransport, AsyncClient
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 
+from app.config import settings
 from app.core.database import Base
 from app.core.dependencies import get_db
 from app.main import app
@@ -16,44 +18,58 @@ TEST_DATABASE_URL = os.environ.get(
 )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session", autouse=True)
+def fast_password_hashing():
+    """Use the minimum bcrypt work factor so registrations and logins stay fast."""
+    with patch.object(settings, "bcrypt_rounds", 4):
+        yield
+
+
+@pytest.fixture(scope="session")
 async def db_engine():
-    """Create a new engine for each test."""
-    engine = create_async_engine(
-        TEST_DATABASE_URL,
-        echo=False,
-        poolclass=NullPool,  # Disable connection pooling for tests
-    )
+    """Create one engine and the schema for the whole test session."""
+    engine = create_async_engine(TEST_DATABASE_URL, echo=False)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
     yield engine
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
     await engine.dispose()
 
 
 @pytest.fixture
 async def db_session(db_engine):
-    """Create tables and provide a session for each test."""
-    # Create tables
-    async with db_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    """Provide a session whose changes are rolled back after each test."""
+    async with db_engine.connect() as conn:
+        transaction = await conn.begin()
 
-    # Create session
-    async_session = async_sessionmaker(
-        bind=db_engine,
-        class_=AsyncSession,
-        expire_on_commit=False,
-        autocommit=False,
-        autoflush=False,
-    )
+        # Commits inside the test only release a savepoint of this transaction
+        async with AsyncSession(
+            bind=conn,
+            expire_on_commit=False,
+            autoflush=False,
+            join_transaction_mode="create_savepoint",
+        ) as session:
+            yield session
 
-    async with async_session() as session:
-        yield session
+        await transaction.rollback()
 
-    # Drop tables after test
-    async with db_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
+
+@pytest.fixture(scope="session")
+async def asgi_client():
+    """One ASGI client shared by every test in the session."""
+    async with AsyncClient(
+        transport=ASGITransport(app=app),
+        base_url="http://test",
+    ) as ac:
+        yield ac
 
 
 @pytest.fixture
-async def client(db_session):
+async def client(asgi_client, db_session):
     """Async test client for FastAPI."""
 
     async def override_get_db():
@@ -61,10 +77,31 @@ async def client(db_session):
 
     app.dependency_overrides[get_db] = override_get_db
 
-    async with AsyncClient(
-        transport=ASGITransport(app=app),
-        base_url="http://test",
-    ) as ac:
-        yield ac
+    yield asgi_client
 
     app.dependency_overrides.clear()
+    asgi_client.cookies.clear()
+
+
+@pytest.fixture
+def mock_db() -> MagicMock:
+    """Mock session where only the methods AsyncSession awaits are async."""
+    db = MagicMock()
+    db.execute = AsyncMock()
+    db.scalar = AsyncMock()
+    db.scalars = AsyncMock()
+    db.flush = AsyncMock()
+    db.commit = AsyncMock()
+    db.refresh = AsyncMock()
+    db.delete = AsyncMock()
+    return db
+
+
+@pytest.fixture(scope="session")
+def scalar_result():
+    """Build a lightweight query result that returns a single value."""
+
+    def _make(value) -> SimpleNamespace:
+        return SimpleNamespace(scalar_one_or_none=lambda: value, scalar=lambda: value)
+
+    return _make
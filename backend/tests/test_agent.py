@@ -10,10 +10,21 @@ from app.schemas.agent import AgentCreate, AgentUpdate
 from app.services import agent as agent_service
 
 
+@pytest.fixture
+def mock_db_factory(scalar_result):
+    """Build a mock session whose execute() result returns a single scalar."""
+
+    def _make(scalar_return=None) -> AsyncMock:
+        mock_db = AsyncMock()
+        mock_db.execute.return_value = scalar_result(scalar_return)
+        return mock_db
+
+    return _make
+
+
 class TestCreateAgent:
     """Test agent creation."""
 
-    @pytest.mark.asyncio
     async def test_create_agent_success(self):
         """Test creating an agent successfully."""
         mock_db = AsyncMock()
@@ -40,7 +51,6 @@ class TestCreateAgent:
         assert agent.slug == "test-agent"
         assert agent.user_id == user_id
 
-    @pytest.mark.asyncio
     async def test_create_agent_with_project(self):
         """Test creating an agent with project ID."""
         mock_db = AsyncMock()
@@ -65,10 +75,8 @@ class TestCreateAgent:
 class TestGetAgentById:
     """Test getting agent by ID."""
 
-    @pytest.mark.asyncio
-    async def test_get_agent_found(self):
+    async def test_get_agent_found(self, mock_db_factory):
         """Test getting an existing agent."""
-        mock_db = AsyncMock()
         agent_id = uuid.uuid4()
         user_id = uuid.uuid4()
 
@@ -76,9 +84,7 @@ class TestGetAgentById:
         mock_agent.id = agent_id
         mock_agent.user_id = user_id
 
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = mock_agent
-        mock_db.execute.return_value = mock_result
+        mock_db = mock_db_factory(mock_agent)
 
         result = await agent_service.get_agent_by_id(
             db=mock_db,
@@ -88,14 +94,9 @@ class TestGetAgentById:
 
         assert result == mock_agent
 
-    @pytest.mark.asyncio
-    async def test_get_agent_not_found(self):
+    async def test_get_agent_not_found(self, mock_db_factory):
         """Test getting a non-existent agent."""
-        mock_db = AsyncMock()
-
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = None
-        mock_db.execute.return_value = mock_result
+        mock_db = mock_db_factory(None)
 
         result = await agent_service.get_agent_by_id(
             db=mock_db,
@@ -104,16 +105,12 @@ class TestGetAgentById:
 
         assert result is None
 
-    @pytest.mark.asyncio
-    async def test_get_agent_without_user_filter(self):
+    async def test_get_agent_without_user_filter(self, mock_db_factory):
         """Test getting agent without user ID filter."""
-        mock_db = AsyncMock()
         agent_id = uuid.uuid4()
 
         mock_agent = MagicMock(spec=Agent)
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = mock_agent
-        mock_db.execute.return_value = mock_result
+        mock_db = mock_db_factory(mock_agent)
 
         result = await agent_service.get_agent_by_id(
             db=mock_db,
@@ -127,17 +124,13 @@ class TestGetAgentById:
 class TestGetAgentBySlug:
     """Test getting agent by slug."""
 
-    @pytest.mark.asyncio
-    async def test_get_agent_by_slug_found(self):
+    async def test_get_agent_by_slug_found(self, mock_db_factory):
         """Test getting an agent by slug."""
-        mock_db = AsyncMock()
 
         mock_agent = MagicMock(spec=Agent)
         mock_agent.slug = "my-agent"
 
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = mock_agent
-        mock_db.execute.return_value = mock_result
+        mock_db = mock_db_factory(mock_agent)
 
         result = await agent_service.get_agent_by_slug(
             db=mock_db,
@@ -146,14 +139,9 @@ class TestGetAgentBySlug:
 
         assert result == mock_agent
 
-    @pytest.mark.asyncio
-    async def test_get_agent_by_slug_not_found(self):
+    async def test_get_agent_by_slug_not_found(self, mock_db_factory):
         """Test getting a non-existent agent by slug."""
-        mock_db = AsyncMock()
-
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = None
-        mock_db.execute.return_value = mock_result
+        mock_db = mock_db_factory(None)
 
         result = await agent_service.get_agent_by_slug(
             db=mock_db,
@@ -166,7 +154,6 @@ class TestGetAgentBySlug:
 class TestGetUserAgents:
     """Test getting user agents with pagination."""
 
-    @pytest.mark.asyncio
     async def test_get_user_agents(self):
         """Test getting paginated user agents."""
         mock_db = AsyncMock()
@@ -193,7 +180,6 @@ class TestGetUserAgents:
         assert total == 10
         assert len(agents) == 5
 
-    @pytest.mark.asyncio
     async def test_get_user_agents_empty(self):
         """Test getting agents when user has none."""
         mock_db = AsyncMock()
@@ -221,10 +207,8 @@ class TestGetUserAgents:
 class TestUpdateAgent:
     """Test updating agents."""
 
-    @pytest.mark.asyncio
-    async def test_update_agent_success(self):
+    async def test_update_agent_success(self, mock_db_factory):
         """Test updating an agent successfully."""
-        mock_db = AsyncMock()
         agent_id = uuid.uuid4()
         user_id = uuid.uuid4()
 
@@ -234,9 +218,7 @@ class TestUpdateAgent:
         mock_agent.source = AgentSource.user.value
         mock_agent.name = "Old Name"
 
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = mock_agent
-        mock_db.execute.return_value = mock_result
+        mock_db = mock_db_factory(mock_agent)
 
         data = AgentUpdate(name="New Name")
 
@@ -251,14 +233,9 @@ class TestUpdateAgent:
         mock_db.flush.assert_called_once()
         mock_db.refresh.assert_called_once()
 
-    @pytest.mark.asyncio
-    async def test_update_agent_not_found(self):
+    async def test_update_agent_not_found(self, mock_db_factory):
         """Test updating a non-existent agent."""
-        mock_db = AsyncMock()
-
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = None
-        mock_db.execute.return_value = mock_result
+        mock_db = mock_db_factory(None)
 
         data = AgentUpdate(name="New Name")
 
@@ -271,10 +248,8 @@ class TestUpdateAgent:
 
         assert result is None
 
-    @pytest.mark.asyncio
-    async def test_update_system_agent_blocked(self):
+    async def test_update_system_agent_blocked(self, mock_db_factory):
         """Test that system agents cannot be updated."""
-        mock_db = AsyncMock()
         agent_id = uuid.uuid4()
         user_id = uuid.uuid4()
 
@@ -282,9 +257,7 @@ class TestUpdateAgent:
         mock_agent.id = agent_id
         mock_agent.source = AgentSource.system.value  # System agent
 
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = mock_agent
-        mock_db.execute.return_value = mock_result
+        mock_db = mock_db_factory(mock_agent)
 
         data = AgentUpdate(name="Hacked Name")
 
@@ -301,10 +274,8 @@ class TestUpdateAgent:
 class TestDeleteAgent:
     """Test deleting agents."""
 
-    @pytest.mark.asyncio
-    async def test_delete_agent_success(self):
+    async def test_delete_agent_success(self, mock_db_factory):
         """Test deleting an agent successfully."""
-        mock_db = AsyncMock()
         agent_id = uuid.uuid4()
         user_id = uuid.uuid4()
 
@@ -313,9 +284,7 @@ class TestDeleteAgent:
         mock_agent.user_id = user_id
         mock_agent.source = AgentSource.user.value
 
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = mock_agent
-        mock_db.execute.return_value = mock_result
+        mock_db = mock_db_factory(mock_agent)
 
         result = await agent_service.delete_agent(
             db=mock_db,
@@ -327,14 +296,9 @@ class TestDeleteAgent:
         mock_db.delete.assert_called_once()
         mock_db.flush.assert_called_once()
 
-    @pytest.mark.asyncio
-    async def test_delete_agent_not_found(self):
+    async def test_delete_agent_not_found(self, mock_db_factory):
         """Test deleting a non-existent agent."""
-        mock_db = AsyncMock()
-
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = None
-        mock_db.execute.return_value = mock_result
+        mock_db = mock_db_factory(None)
 
         result = await agent_service.delete_agent(
             db=mock_db,
@@ -344,10 +308,8 @@ class TestDeleteAgent:
 
         assert result is False
 
-    @pytest.mark.asyncio
-    async def test_delete_system_agent_blocked(self):
+    async def test_delete_system_agent_blocked(self, mock_db_factory):
         """Test that system agents cannot be deleted."""
-        mock_db = AsyncMock()
         agent_id = uuid.uuid4()
         user_id = uuid.uuid4()
 
@@ -355,9 +317,7 @@ class TestDeleteAgent:
         mock_agent.id = agent_id
         mock_agent.source = AgentSource.system.value  # System agent
 
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = mock_agent
-        mock_db.execute.return_value = mock_result
+        mock_db = mock_db_factory(mock_agent)
 
         result = await agent_service.delete_agent(
             db=mock_db,
@@ -372,14 +332,9 @@ class TestDeleteAgent:
 class TestCheckSlugExists:
     """Test slug existence checking."""
 
-    @pytest.mark.asyncio
-    async def test_slug_exists_in_db(self):
+    async def test_slug_exists_in_db(self, mock_db_factory):
         """Test checking a slug that exists in database."""
-        mock_db = AsyncMock()
-
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = uuid.uuid4()  # Found
-        mock_db.execute.return_value = mock_result
+        mock_db = mock_db_factory(uuid.uuid4())  # Found
 
         with patch.object(agent_service.agent_loader, "list_agents", return_value=[]):
             result = await agent_service.check_slug_exists(
@@ -389,14 +344,9 @@ class TestCheckSlugExists:
 
         assert result is True
 
-    @pytest.mark.asyncio
-    async def test_slug_exists_in_system(self):
+    async def test_slug_exists_in_system(self, mock_db_factory):
         """Test checking a slug that exists in system agents."""
-        mock_db = AsyncMock()
-
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = None  # Not in DB
-        mock_db.execute.return_value = mock_result
+        mock_db = mock_db_factory(None)  # Not in DB
 
         system_agents = [{"slug": "system-agent", "name": "System Agent"}]
 
@@ -408,14 +358,9 @@ class TestCheckSlugExists:
 
         assert result is True
 
-    @pytest.mark.asyncio
-    async def test_slug_not_exists(self):
+    async def test_slug_not_exists(self, mock_db_factory):
         """Test checking a slug that doesn't exist."""
-        mock_db = AsyncMock()
-
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = None
-        mock_db.execute.return_value = mock_result
+        mock_db = mock_db_factory(None)
 
         with patch.object(agent_service.agent_loader, "list_agents", return_value=[]):
             result = await agent_service.check_slug_exists(
@@ -425,15 +370,11 @@ class TestCheckSlugExists:
 
         assert result is False
 
-    @pytest.mark.asyncio
-    async def test_slug_exists_excludes_own_id(self):
+    async def test_slug_exists_excludes_own_id(self, mock_db_factory):
         """Test checking slug with exclusion for update."""
-        mock_db = AsyncMock()
         own_id = uuid.uuid4()
 
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = None  # Not found (excluding self)
-        mock_db.execute.return_value = mock_result
+        mock_db = mock_db_factory(None)  # Not found (excluding self)
 
         with patch.object(agent_service.agent_loader, "list_agents", return_value=[]):
             result = await agent_service.check_slug_exists(
@@ -448,7 +389,6 @@ class TestCheckSlugExists:
 class TestGetAllAgentsForUser:
     """Test getting all agents (system + user) for a user."""
 
-    @pytest.mark.asyncio
     async def test_get_all_agents_combined(self):
         """Test getting system and user agents combined."""
         mock_db = AsyncMock()
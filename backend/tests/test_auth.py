@@ -1,8 +1,9 @@
 import pytest
 from httpx import AsyncClient
 
+from app.core.security import hash_password, verify_password
+
 
-@pytest.mark.asyncio
 async def test_register_success(client: AsyncClient):
     """Test successful user registration."""
     response = await client.post(
@@ -23,7 +24,6 @@ async def test_register_success(client: AsyncClient):
     assert "hashed_password" not in data
 
 
-@pytest.mark.asyncio
 async def test_register_duplicate_email(client: AsyncClient):
     """Test registration with duplicate email fails."""
     # First registration
@@ -48,24 +48,36 @@ async def test_register_duplicate_email(client: AsyncClient):
     assert "already registered" in response.json()["detail"]
 
 
-@pytest.mark.asyncio
-async def test_login_success(client: AsyncClient):
-    """Test successful login."""
-    # Register first
-    await client.post(
-        "/api/auth/register",
-        json={
-            "email": "login@example.com",
-            "username": "loginuser",
-            "password": "testpass123",
-        },
+@pytest.fixture
+async def registered_user(client: AsyncClient) -> dict:
+    """Register a user and return its credentials."""
+    user = {
+        "email": "login@example.com",
+        "username": "loginuser",
+        "password": "testpass123",
+    }
+    response = await client.post("/api/auth/register", json=user)
+    assert response.status_code == 201
+    return user
+
+
+async def login(client: AsyncClient, user: dict) -> dict:
+    """Log in as a registered user and return the token response."""
+    response = await client.post(
+        "/api/auth/login",
+        json={"email": user["email"], "password": user["password"]},
     )
-    # Login
+    assert response.status_code == 200
+    return response.json()
+
+
+async def test_login_success(client: AsyncClient, registered_user: dict):
+    """Test successful login."""
     response = await client.post(
         "/api/auth/login",
         json={
-            "email": "login@example.com",
-            "password": "testpass123",
+            "email": registered_user["email"],
+            "password": registered_user["password"],
         },
     )
     assert response.status_code == 200
@@ -75,92 +87,42 @@ async def test_login_success(client: AsyncClient):
     assert data["token_type"] == "bearer"
 
 
-@pytest.mark.asyncio
-async def test_login_wrong_password(client: AsyncClient):
+async def test_login_wrong_password(client: AsyncClient, registered_user: dict):
     """Test login with wrong password fails."""
-    # Register first
-    await client.post(
-        "/api/auth/register",
-        json={
-            "email": "wrongpass@example.com",
-            "username": "wrongpassuser",
-            "password": "testpass123",
-        },
-    )
-    # Login with wrong password
     response = await client.post(
         "/api/auth/login",
         json={
-            "email": "wrongpass@example.com",
+            "email": registered_user["email"],
             "password": "wrongpassword",
         },
     )
     assert response.status_code == 401
 
 
-@pytest.mark.asyncio
-async def test_get_me_authenticated(client: AsyncClient):
+async def test_get_me_authenticated(client: AsyncClient, registered_user: dict):
     """Test getting current user with valid token."""
-    # Register
-    await client.post(
-        "/api/auth/register",
-        json={
-            "email": "me@example.com",
-            "username": "meuser",
-            "password": "testpass123",
-        },
-    )
-    # Login
-    login_response = await client.post(
-        "/api/auth/login",
-        json={
-            "email": "me@example.com",
-            "password": "testpass123",
-        },
-    )
-    token = login_response.json()["access_token"]
+    token = (await login(client, registered_user))["access_token"]
 
-    # Get me
     response = await client.get(
         "/api/auth/me",
         headers={"Authorization": f"Bearer {token}"},
     )
     assert response.status_code == 200
     data = response.json()
-    assert data["email"] == "me@example.com"
-    assert data["username"] == "meuser"
+    assert data["email"] == registered_user["email"]
+    assert data["username"] == registered_user["username"]
 
 
-@pytest.mark.asyncio
 async def test_get_me_unauthenticated(client: AsyncClient):
     """Test getting current user without token fails."""
     response = await client.get("/api/auth/me")
     assert response.status_code == 401
 
 
-@pytest.mark.asyncio
-async def test_refresh_token(client: AsyncClient):
+async def test_refresh_token(client: AsyncClient, registered_user: dict):
     """Test refreshing access token."""
-    # Register
-    await client.post(
-        "/api/auth/register",
-        json={
-            "email": "refresh@example.com",
-            "username": "refreshuser",
-            "password": "testpass123",
-        },
-    )
-    # Login
-    login_response = await client.post(
-        "/api/auth/login",
-        json={
-            "email": "refresh@example.com",
-            "password": "testpass123",
-        },
-    )
-    refresh_token = login_response.json()["refresh_token"]
+    refresh_token = (await login(client, registered_user))["refresh_token"]
 
-    # Refresh
     response = await client.post(
         "/api/auth/refresh",
         json={"refresh_token": refresh_token},
@@ -171,9 +133,17 @@ async def test_refresh_token(client: AsyncClient):
     assert "refresh_token" in data
 
 
-@pytest.mark.asyncio
 async def test_logout(client: AsyncClient):
     """Test logout endpoint."""
     response = await client.post("/api/auth/logout")
     assert response.status_code == 200
     assert "logged out" in response.json()["message"].lower()
+
+
+def test_hash_password_uses_configured_rounds():
+    """Test password hashes use the configured bcrypt work factor."""
+    hashed = hash_password("testpass123")
+
+    assert hashed.startswith("$2b$04$")
+    assert verify_password("testpass123", hashed)
+    assert not verify_password("wrongpassword", hashed)
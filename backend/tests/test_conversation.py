@@ -1,23 +1,22 @@
 """Tests for conversation service - Unit tests with mocking."""
 
 import uuid
-from unittest.mock import AsyncMock, MagicMock, patch
+from types import SimpleNamespace
+from unittest.mock import MagicMock
 
 import pytest
 
 from app.core.exceptions import ForbiddenError, NotFoundError
 from app.models.conversation import Conversation
-from app.models.message import Message, MessageRole
+from app.models.message import MessageRole
 from app.services import conversation as conversation_service
 
 
 class TestConversationServiceUnit:
     """Unit tests for conversation service with mocking."""
 
-    @pytest.mark.asyncio
-    async def test_create_conversation(self):
+    async def test_create_conversation(self, mock_db):
         """Test creating a conversation."""
-        mock_db = AsyncMock()
         user_uuid = uuid.uuid4()
 
         conversation = await conversation_service.create_conversation(
@@ -32,13 +31,9 @@ class TestConversationServiceUnit:
         assert conversation.user_id == user_uuid
         assert conversation.title == "Test Conversation"
 
-    @pytest.mark.asyncio
-    async def test_get_conversation_not_found(self):
+    async def test_get_conversation_not_found(self, mock_db, scalar_result):
         """Test getting a non-existent conversation raises NotFoundError."""
-        mock_db = AsyncMock()
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = None
-        mock_db.execute.return_value = mock_result
+        mock_db.execute.return_value = scalar_result(None)
 
         with pytest.raises(NotFoundError):
             await conversation_service.get_conversation(
@@ -47,10 +42,8 @@ class TestConversationServiceUnit:
                 user_id=uuid.uuid4(),
             )
 
-    @pytest.mark.asyncio
-    async def test_get_conversation_forbidden(self):
+    async def test_get_conversation_forbidden(self, mock_db, scalar_result):
         """Test getting another user's conversation raises ForbiddenError."""
-        mock_db = AsyncMock()
         user1_uuid = uuid.uuid4()
         user2_uuid = uuid.uuid4()
 
@@ -58,9 +51,7 @@ class TestConversationServiceUnit:
         mock_conversation = MagicMock(spec=Conversation)
         mock_conversation.user_id = user1_uuid
 
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = mock_conversation
-        mock_db.execute.return_value = mock_result
+        mock_db.execute.return_value = scalar_result(mock_conversation)
 
         # Try to access with user2
         with pytest.raises(ForbiddenError):
@@ -70,10 +61,8 @@ class TestConversationServiceUnit:
                 user_id=user2_uuid,
             )
 
-    @pytest.mark.asyncio
-    async def test_get_conversation_success(self):
+    async def test_get_conversation_success(self, mock_db, scalar_result):
         """Test getting a conversation successfully."""
-        mock_db = AsyncMock()
         user_uuid = uuid.uuid4()
         conv_id = uuid.uuid4()
 
@@ -83,9 +72,7 @@ class TestConversationServiceUnit:
         mock_conversation.user_id = user_uuid
         mock_conversation.title = "Test"
 
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = mock_conversation
-        mock_db.execute.return_value = mock_result
+        mock_db.execute.return_value = scalar_result(mock_conversation)
 
         result = await conversation_service.get_conversation(
             db=mock_db,
@@ -95,10 +82,8 @@ class TestConversationServiceUnit:
 
         assert result.id == conv_id
 
-    @pytest.mark.asyncio
-    async def test_list_conversations(self):
+    async def test_list_conversations(self, mock_db):
         """Test listing conversations."""
-        mock_db = AsyncMock()
         user_uuid = uuid.uuid4()
 
         # Mock count result
@@ -106,7 +91,7 @@ class TestConversationServiceUnit:
         mock_count_result.scalar.return_value = 5
 
         # Mock conversations result
-        mock_conversations = [MagicMock(spec=Conversation) for _ in range(5)]
+        mock_conversations = [SimpleNamespace(id=uuid.uuid4()) for _ in range(5)]
         mock_conv_result = MagicMock()
         mock_conv_result.scalars.return_value.all.return_value = mock_conversations
 
@@ -121,10 +106,8 @@ class TestConversationServiceUnit:
         assert total == 5
         assert len(conversations) == 5
 
-    @pytest.mark.asyncio
-    async def test_delete_conversation(self):
+    async def test_delete_conversation(self, mock_db, scalar_result):
         """Test deleting a conversation."""
-        mock_db = AsyncMock()
         user_uuid = uuid.uuid4()
         conv_id = uuid.uuid4()
 
@@ -133,9 +116,7 @@ class TestConversationServiceUnit:
         mock_conversation.id = conv_id
         mock_conversation.user_id = user_uuid
 
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = mock_conversation
-        mock_db.execute.return_value = mock_result
+        mock_db.execute.return_value = scalar_result(mock_conversation)
 
         result = await conversation_service.delete_conversation(
             db=mock_db,
@@ -151,18 +132,14 @@ class TestConversationServiceUnit:
 class TestMessageServiceUnit:
     """Unit tests for message-related functions."""
 
-    @pytest.mark.asyncio
-    async def test_add_message(self):
+    async def test_add_message(self, mock_db, scalar_result):
         """Test adding a message to conversation."""
-        mock_db = AsyncMock()
         conv_id = uuid.uuid4()
 
         # Mock execute for conversation query (to check title)
         mock_conv = MagicMock(spec=Conversation)
         mock_conv.title = "Existing Title"
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = mock_conv
-        mock_db.execute.return_value = mock_result
+        mock_db.execute.return_value = scalar_result(mock_conv)
 
         message = await conversation_service.add_message(
             db=mock_db,
@@ -176,15 +153,11 @@ class TestMessageServiceUnit:
         assert message.role == MessageRole.USER
         assert message.content == "Hello, world!"
 
-    @pytest.mark.asyncio
-    async def test_get_message_count(self):
+    async def test_get_message_count(self, mock_db, scalar_result):
         """Test getting message count for conversation."""
-        mock_db = AsyncMock()
         conv_id = uuid.uuid4()
 
-        mock_result = MagicMock()
-        mock_result.scalar.return_value = 10
-        mock_db.execute.return_value = mock_result
+        mock_db.execute.return_value = scalar_result(10)
 
         count = await conversation_service.get_conversation_message_count(
             db=mock_db,
@@ -193,15 +166,11 @@ class TestMessageServiceUnit:
 
         assert count == 10
 
-    @pytest.mark.asyncio
-    async def test_get_last_message_preview(self):
+    async def test_get_last_message_preview(self, mock_db, scalar_result):
         """Test getting last message preview."""
-        mock_db = AsyncMock()
         conv_id = uuid.uuid4()
 
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = "Last message content"
-        mock_db.execute.return_value = mock_result
+        mock_db.execute.return_value = scalar_result("Last message content")
 
         preview = await conversation_service.get_last_message_preview(
             db=mock_db,
@@ -210,16 +179,12 @@ class TestMessageServiceUnit:
 
         assert preview == "Last message content"
 
-    @pytest.mark.asyncio
-    async def test_get_last_message_preview_long_content(self):
+    async def test_get_last_message_preview_long_content(self, mock_db, scalar_result):
         """Test that long preview is truncated."""
-        mock_db = AsyncMock()
         conv_id = uuid.uuid4()
 
         long_content = "A" * 200  # Longer than default max_length
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = long_content
-        mock_db.execute.return_value = mock_result
+        mock_db.execute.return_value = scalar_result(long_content)
 
         preview = await conversation_service.get_last_message_preview(
             db=mock_db,
@@ -234,20 +199,20 @@ class TestMessageServiceUnit:
 class TestGenerateTitleFromMessage:
     """Test title generation function."""
 
-    def test_short_message(self):
-        """Test short message becomes title as-is."""
-        title = conversation_service.generate_title_from_message("Hello world")
-        assert title == "Hello world"
-
-    def test_long_message_truncated(self):
-        """Test long message is truncated."""
-        long_message = "This is a very long message that should be truncated to fit the maximum length limit"
-        title = conversation_service.generate_title_from_message(long_message, max_length=30)
-        assert len(title) <= 33  # 30 + "..."
-        assert title.endswith("...")
-
-    def test_whitespace_normalized(self):
-        """Test multiple whitespace is normalized."""
-        message = "Hello   world\n\nHow are you"
-        title = conversation_service.generate_title_from_message(message)
-        assert title == "Hello world How are you"
+    @pytest.mark.parametrize(
+        ("message", "max_length", "expected"),
+        [
+            ("Hello world", 50, "Hello world"),
+            (
+                "This is a very long message that should be truncated to fit the maximum length limit",
+                30,
+                "This is a very long message th...",
+            ),
+            ("Hello   world\n\nHow are you", 50, "Hello world How are you"),
+        ],
+        ids=["short", "truncated", "whitespace"],
+    )
+    def test_generate_title(self, message: str, max_length: int, expected: str):
+        """Test titles are whitespace-normalized and truncated with an ellipsis."""
+        title = conversation_service.generate_title_from_message(message, max_length=max_length)
+        assert title == expected
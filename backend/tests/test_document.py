@@ -1,158 +1,165 @@
 """Tests for document service - Unit tests with mocking."""
 
 import uuid
-from unittest.mock import AsyncMock, MagicMock, patch
+from types import SimpleNamespace
 
 import pytest
 
-from app.models.document import Document, DocumentStatus
+from app.models.document import DocumentStatus
 from app.schemas.document import DocumentUpdate
 from app.services import document as document_service
 
+# Fixed ids; tests only need them to be distinct
+USER_ID = uuid.UUID(int=1)
+OTHER_USER_ID = uuid.UUID(int=2)
+DOCUMENT_ID = uuid.UUID(int=3)
 
-class TestCreateDocument:
-    """Test document creation."""
 
-    @pytest.mark.asyncio
-    async def test_create_document_success(self):
-        """Test creating a document successfully."""
-        mock_db = AsyncMock()
-        user_id = uuid.uuid4()
-
-        mock_storage = MagicMock()
-        mock_storage.upload = AsyncMock(return_value="uploads/user123/test.pdf")
-
-        with patch("app.services.document.get_storage_service", return_value=mock_storage):
-            document = await document_service.create_document(
-                db=mock_db,
-                user_id=user_id,
-                filename="test.pdf",
-                file_type="pdf",
-                file_size=1024,
-                file_content=b"fake pdf content",
-            )
+def make_document(**fields) -> SimpleNamespace:
+    """Build a lightweight stand-in for a Document row."""
+    defaults = {
+        "filename": "test.pdf",
+        "file_type": "pdf",
+        "file_path": "uploads/user/test.pdf",
+        "status": DocumentStatus.pending,
+    }
+    return SimpleNamespace(**{**defaults, **fields})
 
-            mock_storage.upload.assert_called_once()
-            mock_db.add.assert_called_once()
-            mock_db.flush.assert_called_once()
 
-            assert document.filename == "test.pdf"
-            assert document.file_type == "pdf"
-            assert document.status == DocumentStatus.pending
+def async_stub(return_value=None):
+    """Build a coroutine function that records its calls and returns a fixed value."""
+    calls = []
 
+    async def stub(*args, **kwargs):
+        calls.append((args, kwargs))
+        return return_value
 
-class TestGetDocuments:
-    """Test getting documents with pagination."""
+    stub.calls = calls
+    return stub
 
-    @pytest.mark.asyncio
-    async def test_get_documents(self):
-        """Test getting paginated documents."""
-        mock_db = AsyncMock()
-        user_id = uuid.uuid4()
 
-        # Mock count
-        mock_count_result = MagicMock()
-        mock_count_result.scalar.return_value = 10
+class FakeSession:
+    """Minimal AsyncSession stand-in that records what the service did."""
 
-        # Mock documents
-        mock_docs = [MagicMock(spec=Document) for _ in range(5)]
-        mock_docs_result = MagicMock()
-        mock_docs_result.scalars.return_value.all.return_value = mock_docs
+    def __init__(self, *results):
+        self._results = iter(results)
+        self.added: list = []
+        self.deleted: list = []
+        self.flushes = 0
 
-        mock_db.execute.side_effect = [mock_count_result, mock_docs_result]
+    async def execute(self, statement):
+        return next(self._results)
 
-        documents, total = await document_service.get_documents(
-            db=mock_db,
-            user_id=user_id,
-            page=1,
-            per_page=5,
+    def add(self, instance) -> None:
+        self.added.append(instance)
+
+    async def flush(self) -> None:
+        self.flushes += 1
+
+    async def refresh(self, instance) -> None:
+        pass
+
+    async def delete(self, instance) -> None:
+        self.deleted.append(instance)
+
+
+class TestCreateDocument:
+    """Test document creation."""
+
+    async def test_create_document_success(self, monkeypatch):
+        """Test creating a document successfully."""
+        db = FakeSession()
+
+        mock_storage = SimpleNamespace(upload=async_stub("uploads/user123/test.pdf"))
+
+        monkeypatch.setattr(document_service, "get_storage_service", lambda: mock_storage)
+
+        document = await document_service.create_document(
+            db=db,
+            user_id=USER_ID,
+            filename="test.pdf",
+            file_type="pdf",
+            file_size=1024,
+            file_content=b"fake pdf content",
         )
 
-        assert total == 10
-        assert len(documents) == 5
+        assert len(mock_storage.upload.calls) == 1
+        assert len(db.added) == 1
+        assert db.flushes == 1
 
-    @pytest.mark.asyncio
-    async def test_get_documents_empty(self):
-        """Test getting documents when user has none."""
-        mock_db = AsyncMock()
-        user_id = uuid.uuid4()
+        assert document.filename == "test.pdf"
+        assert document.file_type == "pdf"
+        assert document.file_path == "uploads/user123/test.pdf"
+        assert document.status == DocumentStatus.pending
 
-        # Mock count = 0
-        mock_count_result = MagicMock()
-        mock_count_result.scalar.return_value = 0
 
-        # Mock empty documents
-        mock_docs_result = MagicMock()
-        mock_docs_result.scalars.return_value.all.return_value = []
+class TestGetDocuments:
+    """Test getting documents with pagination."""
 
-        mock_db.execute.side_effect = [mock_count_result, mock_docs_result]
+    @pytest.mark.parametrize(
+        ("count", "n_docs"),
+        [
+            pytest.param(10, 5, id="paginated"),
+            pytest.param(0, 0, id="empty"),
+        ],
+    )
+    async def test_get_documents(self, scalar_result, count: int, n_docs: int):
+        """Test getting a page of documents with the total count."""
+        mock_docs = [make_document() for _ in range(n_docs)]
+        db = FakeSession(
+            scalar_result(count),
+            SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: mock_docs)),
+        )
 
         documents, total = await document_service.get_documents(
-            db=mock_db,
-            user_id=user_id,
+            db=db,
+            user_id=USER_ID,
+            page=1,
+            per_page=5,
         )
 
-        assert total == 0
-        assert len(documents) == 0
+        assert total == count
+        assert documents == mock_docs
 
 
 class TestGetDocument:
     """Test getting a single document."""
 
-    @pytest.mark.asyncio
-    async def test_get_document_found(self):
+    async def test_get_document_found(self, scalar_result):
         """Test getting an existing document."""
-        mock_db = AsyncMock()
-        document_id = uuid.uuid4()
-        user_id = uuid.uuid4()
+        mock_document = make_document(id=DOCUMENT_ID, user_id=USER_ID)
 
-        mock_document = MagicMock(spec=Document)
-        mock_document.id = document_id
-        mock_document.user_id = user_id
-
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = mock_document
-        mock_db.execute.return_value = mock_result
+        db = FakeSession(scalar_result(mock_document))
 
         result = await document_service.get_document(
-            db=mock_db,
-            document_id=document_id,
-            user_id=user_id,
+            db=db,
+            document_id=DOCUMENT_ID,
+            user_id=USER_ID,
         )
 
         assert result == mock_document
 
-    @pytest.mark.asyncio
-    async def test_get_document_not_found(self):
+    async def test_get_document_not_found(self, scalar_result):
         """Test getting a non-existent document."""
-        mock_db = AsyncMock()
-
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = None
-        mock_db.execute.return_value = mock_result
+        db = FakeSession(scalar_result(None))
 
         result = await document_service.get_document(
-            db=mock_db,
-            document_id=uuid.uuid4(),
-            user_id=uuid.uuid4(),
+            db=db,
+            document_id=DOCUMENT_ID,
+            user_id=USER_ID,
         )
 
         assert result is None
 
-    @pytest.mark.asyncio
-    async def test_get_document_wrong_user(self):
+    async def test_get_document_wrong_user(self, scalar_result):
         """Test that document is not returned for wrong user."""
-        mock_db = AsyncMock()
-
         # Returns None because query filters by user_id
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = None
-        mock_db.execute.return_value = mock_result
+        db = FakeSession(scalar_result(None))
 
         result = await document_service.get_document(
-            db=mock_db,
-            document_id=uuid.uuid4(),
-            user_id=uuid.uuid4(),  # Different user
+            db=db,
+            document_id=DOCUMENT_ID,
+            user_id=OTHER_USER_ID,  # Different user
         )
 
         assert result is None
@@ -161,202 +168,168 @@ class TestGetDocument:
 class TestUpdateDocument:
     """Test document updates."""
 
-    @pytest.mark.asyncio
-    async def test_update_document_success(self):
+    async def test_update_document_success(self, scalar_result):
         """Test updating a document successfully."""
-        mock_db = AsyncMock()
-        document_id = uuid.uuid4()
-        user_id = uuid.uuid4()
-
-        mock_document = MagicMock(spec=Document)
-        mock_document.id = document_id
-        mock_document.user_id = user_id
-        mock_document.filename = "old.pdf"
+        mock_document = make_document(
+            id=DOCUMENT_ID,
+            user_id=USER_ID,
+            filename="old.pdf",
+        )
 
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = mock_document
-        mock_db.execute.return_value = mock_result
+        db = FakeSession(scalar_result(mock_document))
 
         data = DocumentUpdate(filename="new.pdf")
 
         result = await document_service.update_document(
-            db=mock_db,
-            document_id=document_id,
-            user_id=user_id,
+            db=db,
+            document_id=DOCUMENT_ID,
+            user_id=USER_ID,
             data=data,
         )
 
         assert result.filename == "new.pdf"
-        mock_db.flush.assert_called_once()
+        assert db.flushes == 1
 
-    @pytest.mark.asyncio
-    async def test_update_document_not_found(self):
+    async def test_update_document_not_found(self, scalar_result):
         """Test updating a non-existent document."""
-        mock_db = AsyncMock()
-
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = None
-        mock_db.execute.return_value = mock_result
+        db = FakeSession(scalar_result(None))
 
         data = DocumentUpdate(filename="new.pdf")
 
         result = await document_service.update_document(
-            db=mock_db,
-            document_id=uuid.uuid4(),
-            user_id=uuid.uuid4(),
+            db=db,
+            document_id=DOCUMENT_ID,
+            user_id=USER_ID,
             data=data,
         )
 
         assert result is None
 
 
+@pytest.fixture
+def delete_env(monkeypatch) -> tuple[SimpleNamespace, SimpleNamespace]:
+    """Stub the storage and vector store that document deletion cleans up."""
+    storage = SimpleNamespace(delete=async_stub())
+    vector_store = SimpleNamespace(delete_by_document=async_stub())
+    monkeypatch.setattr(document_service, "get_storage_service", lambda: storage)
+    monkeypatch.setattr(document_service, "get_vector_store", lambda: vector_store)
+    return storage, vector_store
+
+
 class TestDeleteDocument:
     """Test document deletion."""
 
-    @pytest.mark.asyncio
-    async def test_delete_document_success(self):
+    async def test_delete_document_success(self, scalar_result, delete_env):
         """Test deleting a document successfully."""
-        mock_db = AsyncMock()
-        document_id = uuid.uuid4()
-        user_id = uuid.uuid4()
-
-        mock_document = MagicMock(spec=Document)
-        mock_document.id = document_id
-        mock_document.user_id = user_id
-        mock_document.file_path = "uploads/user/file.pdf"
-
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = mock_document
-        mock_db.execute.return_value = mock_result
+        storage, vector_store = delete_env
 
-        mock_storage = MagicMock()
-        mock_storage.delete = AsyncMock()
+        mock_document = make_document(
+            id=DOCUMENT_ID,
+            user_id=USER_ID,
+            file_path="uploads/user/file.pdf",
+        )
 
-        mock_vector_store = MagicMock()
-        mock_vector_store.delete_by_document = AsyncMock()
+        db = FakeSession(scalar_result(mock_document))
 
-        with patch("app.services.document.get_storage_service", return_value=mock_storage):
-            with patch("app.services.document.get_vector_store", return_value=mock_vector_store):
-                result = await document_service.delete_document(
-                    db=mock_db,
-                    document_id=document_id,
-                    user_id=user_id,
-                )
+        result = await document_service.delete_document(
+            db=db,
+            document_id=DOCUMENT_ID,
+            user_id=USER_ID,
+        )
 
         assert result is True
-        mock_vector_store.delete_by_document.assert_called_once()
-        mock_storage.delete.assert_called_once()
-        mock_db.delete.assert_called_once()
-        mock_db.flush.assert_called_once()
+        assert len(vector_store.delete_by_document.calls) == 1
+        assert storage.delete.calls == [(("uploads/user/file.pdf",), {})]
+        assert db.deleted == [mock_document]
+        assert db.flushes == 1
 
-    @pytest.mark.asyncio
-    async def test_delete_document_not_found(self):
+    async def test_delete_document_not_found(self, scalar_result, delete_env):
         """Test deleting a non-existent document."""
-        mock_db = AsyncMock()
-
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = None
-        mock_db.execute.return_value = mock_result
+        storage, vector_store = delete_env
+        db = FakeSession(scalar_result(None))
 
         result = await document_service.delete_document(
-            db=mock_db,
-            document_id=uuid.uuid4(),
-            user_id=uuid.uuid4(),
+            db=db,
+            document_id=DOCUMENT_ID,
+            user_id=USER_ID,
         )
 
         assert result is False
+        assert vector_store.delete_by_document.calls == []
+        assert storage.delete.calls == []
+        assert db.deleted == []
 
 
 class TestProcessDocument:
     """Test document processing."""
 
-    @pytest.mark.asyncio
-    async def test_process_document_not_found(self):
+    async def test_process_document_not_found(self, scalar_result):
         """Test processing a non-existent document raises error."""
-        mock_db = AsyncMock()
-
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = None
-        mock_db.execute.return_value = mock_result
+        db = FakeSession(scalar_result(None))
 
         with pytest.raises(ValueError, match="not found"):
             await document_service.process_document(
-                db=mock_db,
-                document_id=uuid.uuid4(),
+                db=db,
+                document_id=DOCUMENT_ID,
             )
 
-    @pytest.mark.asyncio
-    async def test_process_document_empty_chunks(self):
+    async def test_process_document_empty_chunks(self, scalar_result, monkeypatch):
         """Test processing a document with no extractable text."""
-        mock_db = AsyncMock()
-        document_id = uuid.uuid4()
-        user_id = uuid.uuid4()
-
-        mock_document = MagicMock(spec=Document)
-        mock_document.id = document_id
-        mock_document.user_id = user_id
-        mock_document.file_type = "pdf"
-        mock_document.file_path = "uploads/user/empty.pdf"
-        mock_document.status = DocumentStatus.pending
-
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = mock_document
-        mock_db.execute.return_value = mock_result
-
-        mock_storage = MagicMock()
-        mock_storage.download = AsyncMock(return_value=b"")
-
-        mock_processor = MagicMock()
-        mock_processor.process = AsyncMock(return_value=[])  # No chunks
-
-        with patch("app.services.document.get_storage_service", return_value=mock_storage):
-            with patch("app.services.document.DocumentProcessor", return_value=mock_processor):
-                result = await document_service.process_document(
-                    db=mock_db,
-                    document_id=document_id,
-                )
+        mock_document = make_document(
+            id=DOCUMENT_ID,
+            user_id=USER_ID,
+            file_type="pdf",
+            file_path="uploads/user/empty.pdf",
+            status=DocumentStatus.pending,
+        )
 
-        assert result.status == DocumentStatus.ready
-        assert result.chunk_count == 0
+        db = FakeSession(scalar_result(mock_document))
 
+        mock_storage = SimpleNamespace(download=async_stub(b""))
+        mock_processor = SimpleNamespace(process=async_stub([]))  # No chunks
 
-class TestCalculatePages:
-    """Test page calculation helper."""
+        monkeypatch.setattr(document_service, "get_storage_service", lambda: mock_storage)
+        monkeypatch.setattr(document_service, "DocumentProcessor", lambda: mock_processor)
 
-    def test_calculate_pages_exact(self):
-        """Test with exact division."""
-        assert document_service.calculate_pages(100, 10) == 10
+        result = await document_service.process_document(
+            db=db,
+            document_id=DOCUMENT_ID,
+        )
 
-    def test_calculate_pages_with_remainder(self):
-        """Test with remainder."""
-        assert document_service.calculate_pages(101, 10) == 11
+        assert result.status == DocumentStatus.ready
+        assert result.chunk_count == 0
 
-    def test_calculate_pages_small_total(self):
-        """Test with total less than per_page."""
-        assert document_service.calculate_pages(5, 10) == 1
 
-    def test_calculate_pages_zero_total(self):
-        """Test with zero total."""
-        assert document_service.calculate_pages(0, 10) == 0
+class TestCalculatePages:
+    """Test page calculation helper."""
 
-    def test_calculate_pages_zero_per_page(self):
-        """Test with zero per_page (edge case)."""
-        assert document_service.calculate_pages(100, 0) == 0
+    @pytest.mark.parametrize(
+        ("total", "per_page", "expected"),
+        [
+            pytest.param(100, 10, 10, id="exact"),
+            pytest.param(101, 10, 11, id="remainder"),
+            pytest.param(5, 10, 1, id="small-total"),
+            pytest.param(0, 10, 0, id="zero-total"),
+            pytest.param(100, 0, 0, id="zero-per-page"),
+        ],
+    )
+    def test_calculate_pages(self, total: int, per_page: int, expected: int):
+        """Test page counts round up and handle zero inputs."""
+        assert document_service.calculate_pages(total, per_page) == expected
 
 
 class TestDocumentStatus:
     """Test document status enum."""
 
-    def test_document_statuses(self):
-        """Test that all expected statuses exist."""
-        assert DocumentStatus.pending
-        assert DocumentStatus.processing
-        assert DocumentStatus.ready
-        assert DocumentStatus.error
-
-    def test_status_values(self):
-        """Test status string values."""
-        assert DocumentStatus.pending.value == "pending"
-        assert DocumentStatus.processing.value == "processing"
-        assert DocumentStatus.ready.value == "ready"
-        assert DocumentStatus.error.value == "error"
+    @pytest.mark.parametrize(
+        ("status", "value"),
+        [
+            (DocumentStatus.pending, "pending"),
+            (DocumentStatus.processing, "processing"),
+            (DocumentStatus.ready, "ready"),
+            (DocumentStatus.error, "error"),
+        ],
+    )
+    def test_status_values(self, status: DocumentStatus, value: str):
+        """Test each status has its expected string value."""
+        assert status.value == value
@@ -1,8 +1,6 @@
-import pytest
 from httpx import AsyncClient
 
 
-@pytest.mark.asyncio
 async def test_health_check(client: AsyncClient):
     """Test health check endpoint."""
     response = await client.get("/health")
@@ -10,7 +8,6 @@ async def test_health_check(client: AsyncClient):
     assert response.json() == {"status": "healthy"}
 
 
-@pytest.mark.asyncio
 async def test_root(client: AsyncClient):
     """Test root endpoint."""
     response = await client.get("/")
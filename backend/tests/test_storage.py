@@ -1,20 +1,37 @@
 """Tests for storage service path traversal protection."""
 
 import tempfile
+import uuid
 
 import pytest
 
 from app.services.storage import LocalStorageService, PathTraversalError
 
+# Paths that resolve outside the storage base directory
+TRAVERSAL_PATHS = [
+    pytest.param("../etc/passwd", id="basic"),
+    pytest.param("../../etc/passwd", id="double"),
+    pytest.param("subdir/../../../etc/passwd", id="hidden"),
+    pytest.param("..%2F..%2Fetc%2Fpasswd".replace("%2F", "/"), id="url-decoded"),
+    pytest.param("/etc/passwd", id="absolute"),
+]
+
+
+@pytest.fixture(scope="module")
+def storage_service():
+    """Create a storage service with a temporary directory shared by the module."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield LocalStorageService(base_path=tmpdir)
+
 
 class TestPathTraversalProtection:
     """Test path traversal protection in storage service."""
 
-    @pytest.fixture
-    def storage_service(self):
-        """Create a storage service with a temporary directory."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            yield LocalStorageService(base_path=tmpdir)
+    @pytest.fixture(scope="class")
+    @classmethod
+    def storage_service(cls):
+        """Path validation never touches the disk, so the base need not exist."""
+        return LocalStorageService(base_path="/nonexistent/storage")
 
     def test_valid_path(self, storage_service):
         """Test that valid paths are allowed."""
@@ -26,28 +43,11 @@ class TestPathTraversalProtection:
         path = storage_service._validate_path("user123/file.txt")
         assert "user123" in str(path)
 
-    def test_path_traversal_blocked(self, storage_service):
-        """Test that path traversal attempts are blocked."""
-        # Basic path traversal
-        with pytest.raises(PathTraversalError):
-            storage_service._validate_path("../etc/passwd")
-
-        # Double traversal
-        with pytest.raises(PathTraversalError):
-            storage_service._validate_path("../../etc/passwd")
-
-        # Hidden traversal
+    @pytest.mark.parametrize("path", TRAVERSAL_PATHS)
+    def test_path_traversal_blocked(self, storage_service, path: str):
+        """Test that paths escaping the base directory are blocked."""
         with pytest.raises(PathTraversalError):
-            storage_service._validate_path("subdir/../../../etc/passwd")
-
-        # URL encoded traversal (after decode)
-        with pytest.raises(PathTraversalError):
-            storage_service._validate_path("..%2F..%2Fetc%2Fpasswd".replace("%2F", "/"))
-
-    def test_absolute_path_blocked(self, storage_service):
-        """Test that absolute paths outside base are blocked."""
-        with pytest.raises(PathTraversalError):
-            storage_service._validate_path("/etc/passwd")
+            storage_service._validate_path(path)
 
     def test_path_with_dots_in_filename(self, storage_service):
         """Test that legitimate dots in filenames are allowed."""
@@ -68,30 +68,19 @@ class TestPathTraversalProtection:
 class TestStorageOperations:
     """Test storage operations with path validation."""
 
-    @pytest.fixture
-    def storage_service(self):
-        """Create a storage service with a temporary directory."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            service = LocalStorageService(base_path=tmpdir)
-            yield service, tmpdir
-
-    @pytest.mark.asyncio
-    async def test_download_path_traversal_blocked(self, storage_service):
-        """Test that download blocks path traversal."""
-        service, _ = storage_service
+    @pytest.mark.parametrize("operation", ["download", "delete", "exists"])
+    async def test_operation_path_traversal_blocked(self, storage_service, operation: str):
+        """Test that file operations block path traversal."""
         with pytest.raises(PathTraversalError):
-            await service.download("../etc/passwd")
+            await getattr(storage_service, operation)("../etc/passwd")
 
-    @pytest.mark.asyncio
-    async def test_delete_path_traversal_blocked(self, storage_service):
-        """Test that delete blocks path traversal."""
-        service, _ = storage_service
-        with pytest.raises(PathTraversalError):
-            await service.delete("../etc/passwd")
+    async def test_upload_stream_writes_all_chunks(self, storage_service):
+        """Test that streamed chunks are written in order."""
 
-    @pytest.mark.asyncio
-    async def test_exists_path_traversal_blocked(self, storage_service):
-        """Test that exists blocks path traversal."""
-        service, _ = storage_service
-        with pytest.raises(PathTraversalError):
-            await service.exists("../etc/passwd")
+        async def chunks():
+            yield b"hello "
+            yield b"world"
+
+        path = await storage_service.upload_stream(chunks(), "greeting.txt", uuid.uuid4())
+        assert path.endswith("_greeting.txt")
+        assert await storage_service.download(path) == b"hello world"
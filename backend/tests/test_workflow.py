@@ -1,24 +1,93 @@
 """Tests for workflow service - Unit tests with mocking."""
 
+import asyncio
 import uuid
+from collections import namedtuple
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
-
-from app.models.workflow import ExecutionStatus, Workflow, WorkflowExecution, WorkflowStatus
-from app.schemas.workflow import WorkflowCreate, WorkflowUpdate
+from redis.exceptions import RedisError
+from sqlalchemy.dialects import postgresql
+
+from app.models.workflow import (
+    ExecutionStatus,
+    Workflow,
+    WorkflowExecution,
+    WorkflowStatus,
+)
+from app.schemas.workflow import WorkflowCreate, WorkflowExecutionInfo, WorkflowUpdate
 from app.services import workflow as workflow_service
+from app.services import workflow_engine
+from app.services.workflow_engine import (
+    ConditionNodeExecutor,
+    WorkflowEngine,
+    compile_workflow,
+    render_template,
+)
+
+# Fixed ids; tests only need them to be distinct
+USER_ID = uuid.UUID(int=1)
+OTHER_USER_ID = uuid.UUID(int=5)
+WORKFLOW_ID = uuid.UUID(int=2)
+EXECUTION_ID = uuid.UUID(int=3)
+COPY_ID = uuid.UUID(int=4)
+
+# A (model, total) row from a windowed pagination query
+PageRow = namedtuple("PageRow", ["item", "total"])
+
+
+class FakePubSub:
+    """In-memory stand-in for a redis PubSub bound to a FakeRedis."""
+
+    def __init__(self, redis: "FakeRedis"):
+        self.redis = redis
+        self.messages: asyncio.Queue = asyncio.Queue()
+        self.closed = False
+
+    async def subscribe(self, channel: str) -> None:
+        self.redis.subscribers.setdefault(channel, []).append(self)
+
+    async def get_message(self, ignore_subscribe_messages: bool, timeout: float):
+        try:
+            return await asyncio.wait_for(self.messages.get(), timeout)
+        except TimeoutError:
+            return None
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+class FakeRedis:
+    """In-memory redis that delivers published messages to subscribers."""
+
+    def __init__(self):
+        self.subscribers: dict[str, list[FakePubSub]] = {}
+        self.pubsubs: list[FakePubSub] = []
+
+    def pubsub(self) -> FakePubSub:
+        pubsub = FakePubSub(self)
+        self.pubsubs.append(pubsub)
+        return pubsub
+
+    async def publish(self, channel: str, message: str) -> int:
+        subscribers = self.subscribers.get(channel, [])
+        for pubsub in subscribers:
+            pubsub.messages.put_nowait({"channel": channel, "data": message})
+        return len(subscribers)
+
+
+def page_result(items: list, total: int) -> SimpleNamespace:
+    """Build a windowed pagination result whose rows all carry the same total."""
+    rows = [PageRow(item, total) for item in items]
+    return SimpleNamespace(all=lambda: rows)
 
 
 class TestCreateWorkflow:
     """Test workflow creation."""
 
-    @pytest.mark.asyncio
-    async def test_create_workflow_success(self):
+    async def test_create_workflow_success(self, mock_db):
         """Test creating a workflow successfully."""
-        mock_db = AsyncMock()
-        user_id = uuid.uuid4()
-
         data = WorkflowCreate(
             name="Test Workflow",
             description="A test workflow",
@@ -26,24 +95,20 @@ class TestCreateWorkflow:
 
         workflow = await workflow_service.create_workflow(
             db=mock_db,
-            user_id=user_id,
+            user_id=USER_ID,
             data=data,
         )
 
         mock_db.add.assert_called_once()
         mock_db.flush.assert_called_once()
-        mock_db.refresh.assert_called_once()
+        mock_db.refresh.assert_not_called()
 
         assert workflow.name == "Test Workflow"
-        assert workflow.user_id == user_id
+        assert workflow.user_id == USER_ID
         assert workflow.status == WorkflowStatus.draft.value
 
-    @pytest.mark.asyncio
-    async def test_create_workflow_as_template(self):
+    async def test_create_workflow_as_template(self, mock_db):
         """Test creating a workflow as template."""
-        mock_db = AsyncMock()
-        user_id = uuid.uuid4()
-
         data = WorkflowCreate(
             name="Template Workflow",
             is_template=True,
@@ -51,7 +116,7 @@ class TestCreateWorkflow:
 
         workflow = await workflow_service.create_workflow(
             db=mock_db,
-            user_id=user_id,
+            user_id=USER_ID,
             data=data,
         )
 
@@ -61,70 +126,33 @@ class TestCreateWorkflow:
 class TestGetWorkflow:
     """Test getting a single workflow."""
 
-    @pytest.mark.asyncio
-    async def test_get_workflow_found(self):
+    async def test_get_workflow_found(self, mock_db, scalar_result):
         """Test getting an existing workflow."""
-        mock_db = AsyncMock()
-        workflow_id = uuid.uuid4()
-        user_id = uuid.uuid4()
+        mock_workflow = SimpleNamespace(id=WORKFLOW_ID, user_id=USER_ID)
 
-        mock_workflow = MagicMock(spec=Workflow)
-        mock_workflow.id = workflow_id
-        mock_workflow.user_id = user_id
-
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = mock_workflow
-        mock_db.execute.return_value = mock_result
+        mock_db.execute.return_value = scalar_result(mock_workflow)
 
         result = await workflow_service.get_workflow(
             db=mock_db,
-            workflow_id=workflow_id,
-            user_id=user_id,
+            workflow_id=WORKFLOW_ID,
+            user_id=USER_ID,
         )
 
-        assert result == mock_workflow
-
-    @pytest.mark.asyncio
-    async def test_get_workflow_not_found(self):
-        """Test getting a non-existent workflow."""
-        mock_db = AsyncMock()
-
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = None
-        mock_db.execute.return_value = mock_result
-
-        result = await workflow_service.get_workflow(
-            db=mock_db,
-            workflow_id=uuid.uuid4(),
-            user_id=uuid.uuid4(),
-        )
+        assert result is mock_workflow
 
-        assert result is None
 
 
 class TestGetWorkflows:
     """Test getting workflows with pagination."""
 
-    @pytest.mark.asyncio
-    async def test_get_workflows(self):
+    async def test_get_workflows(self, mock_db):
         """Test getting paginated workflows."""
-        mock_db = AsyncMock()
-        user_id = uuid.uuid4()
-
-        # Mock count
-        mock_count_result = MagicMock()
-        mock_count_result.scalar.return_value = 15
-
-        # Mock workflows
-        mock_workflows = [MagicMock(spec=Workflow) for _ in range(10)]
-        mock_workflows_result = MagicMock()
-        mock_workflows_result.scalars.return_value.all.return_value = mock_workflows
-
-        mock_db.execute.side_effect = [mock_count_result, mock_workflows_result]
+        mock_workflows = [SimpleNamespace(id=uuid.UUID(int=n)) for n in range(10)]
+        mock_db.execute.return_value = page_result(mock_workflows, 15)
 
         workflows, total = await workflow_service.get_workflows(
             db=mock_db,
-            user_id=user_id,
+            user_id=USER_ID,
             page=1,
             page_size=10,
         )
@@ -132,177 +160,120 @@ class TestGetWorkflows:
         assert total == 15
         assert len(workflows) == 10
 
-    @pytest.mark.asyncio
-    async def test_get_workflows_empty(self):
+    async def test_get_workflows_empty(self, mock_db):
         """Test getting workflows when user has none."""
-        mock_db = AsyncMock()
-        user_id = uuid.uuid4()
+        mock_db.execute.return_value = page_result([], 0)
 
-        mock_count_result = MagicMock()
-        mock_count_result.scalar.return_value = 0
+        workflows, total = await workflow_service.get_workflows(
+            db=mock_db,
+            user_id=USER_ID,
+        )
 
-        mock_workflows_result = MagicMock()
-        mock_workflows_result.scalars.return_value.all.return_value = []
+        assert total == 0
+        assert len(workflows) == 0
+        mock_db.scalar.assert_not_called()
 
-        mock_db.execute.side_effect = [mock_count_result, mock_workflows_result]
+    async def test_get_workflows_past_last_page(self, mock_db):
+        """Test a page past the end still reports the total."""
+        mock_db.execute.return_value = page_result([], 0)
+        mock_db.scalar.return_value = 15
 
         workflows, total = await workflow_service.get_workflows(
             db=mock_db,
-            user_id=user_id,
+            user_id=USER_ID,
+            page=5,
+            page_size=10,
         )
 
-        assert total == 0
-        assert len(workflows) == 0
+        assert total == 15
+        assert workflows == []
 
 
 class TestUpdateWorkflow:
     """Test workflow updates."""
 
-    @pytest.mark.asyncio
-    async def test_update_workflow_success(self):
+    async def test_update_workflow_success(self, mock_db, scalar_result):
         """Test updating a workflow successfully."""
-        mock_db = AsyncMock()
-        workflow_id = uuid.uuid4()
-        user_id = uuid.uuid4()
-
-        mock_workflow = MagicMock(spec=Workflow)
-        mock_workflow.id = workflow_id
-        mock_workflow.user_id = user_id
-        mock_workflow.name = "Old Name"
+        mock_workflow = SimpleNamespace(
+            id=WORKFLOW_ID,
+            user_id=USER_ID,
+            name="Old Name",
+            nodes=[],
+            edges=[],
+            updated_at=None,
+        )
 
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = mock_workflow
-        mock_db.execute.return_value = mock_result
+        mock_db.execute.return_value = scalar_result(mock_workflow)
 
         data = WorkflowUpdate(name="New Name", description="Updated description")
 
         result = await workflow_service.update_workflow(
             db=mock_db,
-            workflow_id=workflow_id,
-            user_id=user_id,
+            workflow_id=WORKFLOW_ID,
+            user_id=USER_ID,
             data=data,
         )
 
         assert result.name == "New Name"
         assert result.description == "Updated description"
         mock_db.flush.assert_called()
-        mock_db.refresh.assert_called_once()
+        mock_db.refresh.assert_not_called()
 
-    @pytest.mark.asyncio
-    async def test_update_workflow_not_found(self):
-        """Test updating a non-existent workflow."""
-        mock_db = AsyncMock()
-
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = None
-        mock_db.execute.return_value = mock_result
-
-        data = WorkflowUpdate(name="New Name")
-
-        result = await workflow_service.update_workflow(
-            db=mock_db,
-            workflow_id=uuid.uuid4(),
-            user_id=uuid.uuid4(),
-            data=data,
-        )
-
-        assert result is None
 
 
 class TestDeleteWorkflow:
     """Test workflow deletion."""
 
-    @pytest.mark.asyncio
-    async def test_delete_workflow_success(self):
+    async def test_delete_workflow_success(self, mock_db, scalar_result):
         """Test deleting a workflow successfully."""
-        mock_db = AsyncMock()
-        workflow_id = uuid.uuid4()
-        user_id = uuid.uuid4()
-
-        mock_workflow = MagicMock(spec=Workflow)
-        mock_workflow.id = workflow_id
-        mock_workflow.user_id = user_id
+        mock_workflow = SimpleNamespace(id=WORKFLOW_ID, user_id=USER_ID)
 
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = mock_workflow
-        mock_db.execute.return_value = mock_result
+        mock_db.execute.return_value = scalar_result(mock_workflow)
 
         result = await workflow_service.delete_workflow(
             db=mock_db,
-            workflow_id=workflow_id,
-            user_id=user_id,
+            workflow_id=WORKFLOW_ID,
+            user_id=USER_ID,
         )
 
         assert result is True
         mock_db.delete.assert_called_once()
         mock_db.flush.assert_called_once()
 
-    @pytest.mark.asyncio
-    async def test_delete_workflow_not_found(self):
-        """Test deleting a non-existent workflow."""
-        mock_db = AsyncMock()
-
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = None
-        mock_db.execute.return_value = mock_result
-
-        result = await workflow_service.delete_workflow(
-            db=mock_db,
-            workflow_id=uuid.uuid4(),
-            user_id=uuid.uuid4(),
-        )
-
-        assert result is False
 
 
 class TestDuplicateWorkflow:
     """Test workflow duplication."""
 
-    @pytest.mark.asyncio
-    async def test_duplicate_workflow_success(self):
+    async def test_duplicate_workflow_success(self, mock_db):
         """Test duplicating a workflow successfully."""
-        mock_db = AsyncMock()
-        workflow_id = uuid.uuid4()
-        user_id = uuid.uuid4()
-
-        mock_original = MagicMock(spec=Workflow)
-        mock_original.id = workflow_id
-        mock_original.user_id = user_id
-        mock_original.name = "Original"
-        mock_original.description = "Original description"
-        mock_original.nodes = [{"id": "1", "type": "input"}]
-        mock_original.edges = []
-        mock_original.viewport = {"x": 0, "y": 0, "zoom": 1}
-        mock_original.config = {}
-
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = mock_original
-        mock_db.execute.return_value = mock_result
+        mock_copy = SimpleNamespace(id=COPY_ID)
+        mock_db.scalars.return_value = SimpleNamespace(one_or_none=lambda: mock_copy)
 
         result = await workflow_service.duplicate_workflow(
             db=mock_db,
-            workflow_id=workflow_id,
-            user_id=user_id,
+            workflow_id=WORKFLOW_ID,
+            user_id=USER_ID,
         )
 
-        assert result.name == "Original (Copy)"
-        assert result.status == WorkflowStatus.draft.value
-        assert result.is_template is False
-        mock_db.add.assert_called_once()
+        assert result is mock_copy
+        mock_db.scalars.assert_called_once()
+        mock_db.add.assert_not_called()
 
-    @pytest.mark.asyncio
-    async def test_duplicate_workflow_not_found(self):
-        """Test duplicating a non-existent workflow."""
-        mock_db = AsyncMock()
+        # The copy is made by a single INSERT ... SELECT
+        sql = str(mock_db.scalars.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert sql.startswith("INSERT INTO workflows")
+        assert "SELECT" in sql
+        assert "RETURNING" in sql
 
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = None
-        mock_db.execute.return_value = mock_result
+    async def test_duplicate_workflow_not_found(self, mock_db):
+        """Test duplicating a non-existent workflow."""
+        mock_db.scalars.return_value = SimpleNamespace(one_or_none=lambda: None)
 
         result = await workflow_service.duplicate_workflow(
             db=mock_db,
-            workflow_id=uuid.uuid4(),
-            user_id=uuid.uuid4(),
+            workflow_id=WORKFLOW_ID,
+            user_id=USER_ID,
         )
 
         assert result is None
@@ -311,72 +282,37 @@ class TestDuplicateWorkflow:
 class TestGetExecution:
     """Test getting workflow execution."""
 
-    @pytest.mark.asyncio
-    async def test_get_execution_found(self):
+    async def test_get_execution_found(self, mock_db, scalar_result):
         """Test getting an existing execution."""
-        mock_db = AsyncMock()
-        execution_id = uuid.uuid4()
-        user_id = uuid.uuid4()
-
-        mock_execution = MagicMock(spec=WorkflowExecution)
-        mock_execution.id = execution_id
-        mock_execution.user_id = user_id
+        mock_execution = SimpleNamespace(id=EXECUTION_ID, user_id=USER_ID)
 
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = mock_execution
-        mock_db.execute.return_value = mock_result
+        mock_db.execute.return_value = scalar_result(mock_execution)
 
         result = await workflow_service.get_execution(
             db=mock_db,
-            execution_id=execution_id,
-            user_id=user_id,
+            execution_id=EXECUTION_ID,
+            user_id=USER_ID,
         )
 
-        assert result == mock_execution
+        assert result is mock_execution
 
-    @pytest.mark.asyncio
-    async def test_get_execution_not_found(self):
-        """Test getting a non-existent execution."""
-        mock_db = AsyncMock()
-
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = None
-        mock_db.execute.return_value = mock_result
-
-        result = await workflow_service.get_execution(
-            db=mock_db,
-            execution_id=uuid.uuid4(),
-            user_id=uuid.uuid4(),
-        )
-
-        assert result is None
+    def test_execution_response_omits_node_states(self):
+        """Test the execution response no longer advertises node_states."""
+        assert "node_states" not in WorkflowExecutionInfo.model_fields
 
 
 class TestGetWorkflowExecutions:
     """Test getting workflow executions with pagination."""
 
-    @pytest.mark.asyncio
-    async def test_get_workflow_executions(self):
+    async def test_get_workflow_executions(self, mock_db):
         """Test getting paginated executions."""
-        mock_db = AsyncMock()
-        workflow_id = uuid.uuid4()
-        user_id = uuid.uuid4()
-
-        # Mock count
-        mock_count_result = MagicMock()
-        mock_count_result.scalar.return_value = 5
-
-        # Mock executions
-        mock_executions = [MagicMock(spec=WorkflowExecution) for _ in range(5)]
-        mock_executions_result = MagicMock()
-        mock_executions_result.scalars.return_value.all.return_value = mock_executions
-
-        mock_db.execute.side_effect = [mock_count_result, mock_executions_result]
+        mock_executions = [SimpleNamespace(id=uuid.UUID(int=n)) for n in range(5)]
+        mock_db.execute.return_value = page_result(mock_executions, 5)
 
         executions, total = await workflow_service.get_workflow_executions(
             db=mock_db,
-            workflow_id=workflow_id,
-            user_id=user_id,
+            workflow_id=WORKFLOW_ID,
+            user_id=USER_ID,
         )
 
         assert total == 5
@@ -386,150 +322,462 @@ class TestGetWorkflowExecutions:
 class TestCancelExecution:
     """Test execution cancellation."""
 
-    @pytest.mark.asyncio
-    async def test_cancel_running_execution(self):
+    async def test_cancel_running_execution(self, mock_db, scalar_result):
         """Test cancelling a running execution."""
-        mock_db = AsyncMock()
-        execution_id = uuid.uuid4()
-        user_id = uuid.uuid4()
-
-        mock_execution = MagicMock(spec=WorkflowExecution)
-        mock_execution.id = execution_id
-        mock_execution.user_id = user_id
-        mock_execution.status = ExecutionStatus.running.value
+        mock_execution = SimpleNamespace(
+            id=EXECUTION_ID,
+            user_id=USER_ID,
+            status=ExecutionStatus.running.value,
+        )
 
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = mock_execution
-        mock_db.execute.return_value = mock_result
+        mock_db.execute.return_value = scalar_result(mock_execution)
 
-        result = await workflow_service.cancel_execution(
-            db=mock_db,
-            execution_id=execution_id,
-            user_id=user_id,
-        )
+        mock_redis = AsyncMock()
+        with patch.object(workflow_service, "get_redis", return_value=mock_redis):
+            result = await workflow_service.cancel_execution(
+                db=mock_db,
+                execution_id=EXECUTION_ID,
+                user_id=USER_ID,
+            )
 
         assert result.status == ExecutionStatus.cancelled.value
         mock_db.flush.assert_called()
+        # The running engine is signalled to stop
+        mock_redis.publish.assert_awaited_once_with(f"workflow:cancel:{EXECUTION_ID}", "1")
 
-    @pytest.mark.asyncio
-    async def test_cancel_pending_execution(self):
+    async def test_cancel_pending_execution(self, mock_db, scalar_result):
         """Test cancelling a pending execution."""
-        mock_db = AsyncMock()
-        execution_id = uuid.uuid4()
-        user_id = uuid.uuid4()
-
-        mock_execution = MagicMock(spec=WorkflowExecution)
-        mock_execution.id = execution_id
-        mock_execution.user_id = user_id
-        mock_execution.status = ExecutionStatus.pending.value
+        mock_execution = SimpleNamespace(
+            id=EXECUTION_ID,
+            user_id=USER_ID,
+            status=ExecutionStatus.pending.value,
+        )
 
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = mock_execution
-        mock_db.execute.return_value = mock_result
+        mock_db.execute.return_value = scalar_result(mock_execution)
 
-        result = await workflow_service.cancel_execution(
-            db=mock_db,
-            execution_id=execution_id,
-            user_id=user_id,
-        )
+        with patch.object(workflow_service, "get_redis", return_value=AsyncMock()):
+            result = await workflow_service.cancel_execution(
+                db=mock_db,
+                execution_id=EXECUTION_ID,
+                user_id=USER_ID,
+            )
 
         assert result.status == ExecutionStatus.cancelled.value
 
-    @pytest.mark.asyncio
-    async def test_cancel_completed_execution_no_effect(self):
+    async def test_cancel_completed_execution_no_effect(self, mock_db, scalar_result):
         """Test that cancelling a completed execution has no effect."""
-        mock_db = AsyncMock()
-        execution_id = uuid.uuid4()
-        user_id = uuid.uuid4()
-
-        mock_execution = MagicMock(spec=WorkflowExecution)
-        mock_execution.id = execution_id
-        mock_execution.user_id = user_id
-        mock_execution.status = ExecutionStatus.completed.value
+        mock_execution = SimpleNamespace(
+            id=EXECUTION_ID,
+            user_id=USER_ID,
+            status=ExecutionStatus.completed.value,
+        )
 
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = mock_execution
-        mock_db.execute.return_value = mock_result
+        mock_db.execute.return_value = scalar_result(mock_execution)
 
         result = await workflow_service.cancel_execution(
             db=mock_db,
-            execution_id=execution_id,
-            user_id=user_id,
+            execution_id=EXECUTION_ID,
+            user_id=USER_ID,
         )
 
         # Status should remain completed
         assert result.status == ExecutionStatus.completed.value
 
-    @pytest.mark.asyncio
-    async def test_cancel_execution_not_found(self):
-        """Test cancelling a non-existent execution."""
-        mock_db = AsyncMock()
 
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = None
-        mock_db.execute.return_value = mock_result
 
-        result = await workflow_service.cancel_execution(
-            db=mock_db,
-            execution_id=uuid.uuid4(),
-            user_id=uuid.uuid4(),
-        )
-
-        assert result is None
+class TestMissingRecords:
+    """Test lookups of workflows and executions that do not exist."""
+
+    @pytest.mark.parametrize(
+        ("service_fn", "kwargs", "expected"),
+        [
+            pytest.param(
+                workflow_service.get_workflow,
+                {"workflow_id": WORKFLOW_ID},
+                None,
+                id="get_workflow",
+            ),
+            pytest.param(
+                workflow_service.update_workflow,
+                {"workflow_id": WORKFLOW_ID, "data": WorkflowUpdate(name="New")},
+                None,
+                id="update_workflow",
+            ),
+            pytest.param(
+                workflow_service.delete_workflow,
+                {"workflow_id": WORKFLOW_ID},
+                False,
+                id="delete_workflow",
+            ),
+            pytest.param(
+                workflow_service.get_execution,
+                {"execution_id": EXECUTION_ID},
+                None,
+                id="get_execution",
+            ),
+            pytest.param(
+                workflow_service.cancel_execution,
+                {"execution_id": EXECUTION_ID},
+                None,
+                id="cancel_execution",
+            ),
+        ],
+    )
+    async def test_not_found(self, mock_db, scalar_result, service_fn, kwargs, expected):
+        """Test each lookup reports a missing record without touching the session."""
+        mock_db.execute.return_value = scalar_result(None)
+
+        result = await service_fn(db=mock_db, user_id=USER_ID, **kwargs)
+
+        assert result is expected
+        mock_db.flush.assert_not_called()
 
 
 class TestExecuteWorkflow:
     """Test workflow execution."""
 
-    @pytest.mark.asyncio
-    async def test_execute_workflow_not_found(self):
+    async def test_execute_workflow_not_found(self, mock_db, scalar_result):
         """Test executing a non-existent workflow raises error."""
-        mock_db = AsyncMock()
-
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = None
-        mock_db.execute.return_value = mock_result
+        mock_db.execute.return_value = scalar_result(None)
 
         with pytest.raises(ValueError, match="not found"):
             await workflow_service.execute_workflow(
                 db=mock_db,
-                workflow_id=uuid.uuid4(),
-                user_id=uuid.uuid4(),
+                workflow_id=WORKFLOW_ID,
+                user_id=USER_ID,
+                inputs={},
+            )
+
+    async def test_cancel_from_another_session(self, mock_db, scalar_result, monkeypatch):
+        """Test a cancel request in a second session stops a running execution."""
+        started = asyncio.Event()
+
+        class BlockingEngine:
+            def __init__(self, workflow, execution, db):
+                pass
+
+            async def execute(self, inputs):
+                started.set()
+                await asyncio.Event().wait()
+
+        redis = FakeRedis()
+        monkeypatch.setattr(workflow_service, "get_redis", lambda: redis)
+        monkeypatch.setattr(workflow_service, "WorkflowEngine", BlockingEngine)
+        mock_db.execute.return_value = scalar_result(SimpleNamespace(id=WORKFLOW_ID))
+
+        async def commit():
+            # Like a real commit, flush the added row and assign its primary key
+            mock_db.add.call_args.args[0].id = EXECUTION_ID
+
+        mock_db.commit.side_effect = commit
+
+        run = asyncio.create_task(
+            workflow_service.execute_workflow(
+                db=mock_db,
+                workflow_id=WORKFLOW_ID,
+                user_id=USER_ID,
                 inputs={},
             )
+        )
+        await asyncio.wait_for(started.wait(), 1)
+
+        # The running row was committed, so the other session can load it
+        mock_db.commit.assert_awaited_once()
+        execution = mock_db.add.call_args.args[0]
+        assert execution.id == EXECUTION_ID
+        assert execution.status == ExecutionStatus.running.value
+
+        other_db = MagicMock()
+        other_db.execute = AsyncMock(return_value=scalar_result(execution))
+        other_db.flush = AsyncMock()
+        await workflow_service.cancel_execution(
+            db=other_db,
+            execution_id=execution.id,
+            user_id=USER_ID,
+        )
+
+        result = await asyncio.wait_for(run, 1)
+
+        assert result is execution
+        assert result.status == ExecutionStatus.cancelled.value
+        assert f"workflow:cancel:{EXECUTION_ID}" in redis.subscribers
+        assert all(pubsub.closed for pubsub in redis.pubsubs)
 
 
 class TestWorkflowStatus:
     """Test workflow status enum."""
 
-    def test_workflow_statuses(self):
-        """Test that all expected statuses exist."""
-        assert WorkflowStatus.draft
-        assert WorkflowStatus.active
-        assert WorkflowStatus.archived
-
-    def test_status_values(self):
-        """Test status string values."""
-        assert WorkflowStatus.draft.value == "draft"
-        assert WorkflowStatus.active.value == "active"
-        assert WorkflowStatus.archived.value == "archived"
+    @pytest.mark.parametrize(
+        ("status", "value"),
+        [
+            (WorkflowStatus.draft, "draft"),
+            (WorkflowStatus.active, "active"),
+            (WorkflowStatus.archived, "archived"),
+        ],
+    )
+    def test_status_values(self, status: WorkflowStatus, value: str):
+        """Test each status has its expected string value."""
+        assert status.value == value
 
 
 class TestExecutionStatus:
     """Test execution status enum."""
 
-    def test_execution_statuses(self):
-        """Test that all expected statuses exist."""
-        assert ExecutionStatus.pending
-        assert ExecutionStatus.running
-        assert ExecutionStatus.completed
-        assert ExecutionStatus.failed
-        assert ExecutionStatus.cancelled
-
-    def test_status_values(self):
-        """Test status string values."""
-        assert ExecutionStatus.pending.value == "pending"
-        assert ExecutionStatus.running.value == "running"
-        assert ExecutionStatus.completed.value == "completed"
-        assert ExecutionStatus.failed.value == "failed"
-        assert ExecutionStatus.cancelled.value == "cancelled"
+    @pytest.mark.parametrize(
+        ("status", "value"),
+        [
+            (ExecutionStatus.pending, "pending"),
+            (ExecutionStatus.running, "running"),
+            (ExecutionStatus.completed, "completed"),
+            (ExecutionStatus.failed, "failed"),
+            (ExecutionStatus.cancelled, "cancelled"),
+        ],
+    )
+    def test_status_values(self, status: ExecutionStatus, value: str):
+        """Test each status has its expected string value."""
+        assert status.value == value
+
+
+class TestRenderTemplate:
+    """Test workflow template rendering."""
+
+    def test_render_inputs_and_node_outputs(self):
+        """Test input and node output variables are substituted."""
+        state = {
+            "inputs": {"query": "cats"},
+            "node_outputs": {"rag-1": {"output": "context"}, "raw": 42},
+        }
+
+        result = render_template("{{query}} | {{ nodes.rag-1 }} | {{nodes.raw}}", state)
+
+        assert result == "cats | context | 42"
+
+    def test_render_leaves_unknown_variables(self):
+        """Test unknown variables are left untouched."""
+        state = {"inputs": {}, "node_outputs": {}}
+
+        assert render_template("{{missing}} {{nodes.x}}", state) == "{{missing}} {{nodes.x}}"
+
+    def test_render_is_single_pass(self):
+        """Test substituted values are not rendered again."""
+        state = {"inputs": {"a": "{{b}}", "b": "nope"}, "node_outputs": {}}
+
+        assert render_template("{{a}}", state) == "{{b}}"
+
+    def test_render_keys_with_any_characters(self):
+        """Test keys with dots, spaces or symbols are substituted like plain keys."""
+        state = {
+            "inputs": {"user.name": "Ann", "first name": "A", "price($)": 5},
+            "node_outputs": {"node 1": {"output": "done"}},
+        }
+
+        result = render_template(
+            "{{user.name}} {{first name}} {{ price($) }} {{nodes.node 1}}", state
+        )
+
+        assert result == "Ann A 5 done"
+
+
+class TestConditionEvaluator:
+    """Test condition node evaluation."""
+
+    async def test_condition_operators(self):
+        """Test operators coerce the compare value as before."""
+        executor = ConditionNodeExecutor()
+        state = {"inputs": {"count": "7", "name": "workflow"}}
+
+        async def branch(variable: str, operator: str, value) -> str:
+            config = {"config": {"variable": variable, "operator": operator, "value": value}}
+            return (await executor.execute(config, state, None))["branch"]
+
+        assert await branch("inputs.count", "equals", 7) == "true"
+        assert await branch("inputs.count", "greater_than", "5") == "true"
+        assert await branch("inputs.name", "less_than", 5) == "false"
+        assert await branch("inputs.name", "contains", "flow") == "true"
+        assert await branch("inputs.missing", "is_empty", "") == "true"
+        assert await branch("inputs.name", "unknown", "") == "false"
+
+
+class TestCompileWorkflow:
+    """Test workflow graph compilation."""
+
+    def test_branch_targets(self):
+        """Test condition edges resolve to the first matching target per branch."""
+        workflow = Workflow(
+            id=WORKFLOW_ID,
+            nodes=[
+                {"id": "start", "data": {"type": "start"}},
+                {"id": "cond", "data": {"type": "condition"}},
+                {"id": "yes", "data": {"type": "end"}},
+                {"id": "no", "data": {"type": "end"}},
+            ],
+            edges=[
+                {"source": "start", "target": "cond"},
+                {"source": "cond", "target": "missing", "label": "true"},
+                {"source": "cond", "target": "no", "sourceHandle": "FALSE", "label": "false"},
+                {"source": "cond", "target": "yes", "sourceHandle": "true", "label": None},
+            ],
+        )
+
+        compiled = compile_workflow(workflow)
+
+        assert compiled.start_node["id"] == "start"
+        assert compiled.branch_targets["cond"] == {"true": "yes", "false": "no"}
+        assert compiled.branch_targets["start"] == {"true": "cond"}
+
+
+class TestWorkflowEngine:
+    """Test workflow engine traversal."""
+
+    @staticmethod
+    def make_chain(node_type: str, config: dict) -> Workflow:
+        """Build start -> two identical nodes -> end."""
+        return Workflow(
+            id=WORKFLOW_ID,
+            nodes=[
+                {"id": "start", "data": {"type": "start"}},
+                {"id": "node-1", "data": {"type": node_type, "config": config}},
+                {"id": "node-2", "data": {"type": node_type, "config": config}},
+                {"id": "end", "data": {"type": "end"}},
+            ],
+            edges=[
+                {"source": "start", "target": "node-1"},
+                {"source": "node-1", "target": "node-2"},
+                {"source": "node-2", "target": "end"},
+            ],
+        )
+
+    async def test_identical_nodes_execute_once_per_run(self):
+        """Test a node with the same inputs reuses the result from earlier in the run."""
+        workflow = self.make_chain("llm", {"prompt": "Summarize {{text}}", "temperature": 0})
+        execution = WorkflowExecution(id=EXECUTION_ID, user_id=USER_ID)
+        engine = WorkflowEngine(workflow, execution, AsyncMock())
+
+        llm_executor = workflow_engine.NODE_EXECUTORS["llm"]
+        with (
+            patch.object(
+                llm_executor,
+                "execute",
+                AsyncMock(return_value={"output": "summary", "tokens_used": 10}),
+            ) as mock_execute,
+            patch.object(
+                workflow_engine, "_get_cached_node_result", AsyncMock(return_value=None)
+            ) as mock_get_cached,
+            patch.object(workflow_engine, "_cache_node_result", AsyncMock()) as mock_cache,
+        ):
+            result = await engine.execute({"text": "cats"})
+
+        mock_execute.assert_awaited_once()
+        # Without "cache": true the result is not shared across runs
+        mock_get_cached.assert_not_awaited()
+        mock_cache.assert_not_awaited()
+        assert result["outputs"]["node-2"] == {"output": "summary", "tokens_used": 10}
+        assert result["total_tokens"] == 10
+        assert "node_states" not in result
+        assert result["logs"][2]["cached"] is True
+
+    @pytest.mark.parametrize(
+        ("node_type", "config"),
+        [
+            pytest.param("llm", {"prompt": "Write a poem", "temperature": 0.7}, id="sampled_llm"),
+            pytest.param("http", {"url": "https://example.test/status"}, id="http_get"),
+        ],
+    )
+    async def test_unrepeatable_nodes_execute_every_time(self, node_type, config):
+        """Test sampled LLM and HTTP nodes run again even with identical inputs."""
+        execution = WorkflowExecution(id=EXECUTION_ID, user_id=USER_ID)
+        engine = WorkflowEngine(self.make_chain(node_type, config), execution, AsyncMock())
+
+        executor = workflow_engine.NODE_EXECUTORS[node_type]
+        with patch.object(
+            executor, "execute", AsyncMock(return_value={"output": "fresh"})
+        ) as mock_execute:
+            result = await engine.execute({})
+
+        assert mock_execute.await_count == 2
+        assert not any(log.get("cached") for log in result["logs"])
+
+def make_engine(user_id: uuid.UUID = USER_ID) -> WorkflowEngine:
+    """Build an engine for an empty workflow, for testing node-level helpers."""
+    workflow = Workflow(id=WORKFLOW_ID, nodes=[], edges=[])
+    execution = WorkflowExecution(id=EXECUTION_ID, user_id=user_id)
+    return WorkflowEngine(workflow, execution, AsyncMock())
+
+
+class TestNodeCache:
+    """Test memoization keys and the Redis node result cache."""
+
+    def test_cache_key_is_stable_and_scoped_per_user(self):
+        """Test identical inputs share a key that differs between users."""
+        executor = workflow_engine.NODE_EXECUTORS["llm"]
+        config = {"prompt": "Hi", "temperature": 0}
+
+        key = make_engine()._node_cache_key(executor, "llm", "llm-1", config)
+
+        assert key.startswith(workflow_engine.NODE_CACHE_KEY_PREFIX)
+        assert make_engine()._node_cache_key(executor, "llm", "llm-2", config) == key
+        assert make_engine(OTHER_USER_ID)._node_cache_key(executor, "llm", "llm-1", config) != key
+
+    @pytest.mark.parametrize(
+        ("node_type", "config"),
+        [
+            pytest.param("llm", {"prompt": "Hi"}, id="llm_default_temperature"),
+            pytest.param("llm", {"prompt": "Hi", "temperature": 0.2}, id="llm_sampled"),
+            pytest.param("llm", {"prompt": "Hi", "temperature": None}, id="llm_null_temperature"),
+            pytest.param("llm", {"prompt": "Hi", "temperature": "0"}, id="llm_string_temperature"),
+            pytest.param("http", {"url": "https://x.test", "method": "POST"}, id="http_post"),
+            pytest.param("custom_function", {"code": "result = 1"}, id="custom_function"),
+        ],
+    )
+    def test_no_cache_key_for_unrepeatable_nodes(self, node_type, config):
+        """Test nodes whose result can differ for the same inputs get no key."""
+        executor = workflow_engine.NODE_EXECUTORS[node_type]
+
+        assert make_engine()._node_cache_key(executor, node_type, "n", config) is None
+
+    @pytest.mark.parametrize(
+        ("config", "enabled", "expected"),
+        [
+            pytest.param({"prompt": "Hi", "temperature": 0}, True, False, id="not_opted_in"),
+            pytest.param({"temperature": 0, "cache": True}, True, True, id="opted_in"),
+            pytest.param({"temperature": 0, "cache": True}, False, False, id="disabled"),
+        ],
+    )
+    def test_shared_cache_is_opt_in(self, monkeypatch, config, enabled, expected):
+        """Test results are shared across runs only for nodes with "cache": true."""
+        monkeypatch.setattr(workflow_engine.settings, "workflow_node_cache_enabled", enabled)
+        executor = workflow_engine.NODE_EXECUTORS["llm"]
+
+        assert WorkflowEngine._uses_shared_cache(executor, config) is expected
+
+    async def test_cached_result_round_trip(self, monkeypatch):
+        """Test a stored result is read back with its TTL applied."""
+        store = {}
+
+        async def set_(key, value, ex):
+            store[key] = (value, ex)
+
+        async def get(key):
+            return store.get(key, (None,))[0]
+
+        redis = SimpleNamespace(get=get, set=set_)
+        monkeypatch.setattr(workflow_engine, "get_redis", lambda: redis)
+
+        await workflow_engine._cache_node_result("k", {"output": "hi"}, 60)
+
+        assert store["k"][1] == 60
+        assert await workflow_engine._get_cached_node_result("k") == {"output": "hi"}
+        assert await workflow_engine._get_cached_node_result("missing") is None
+
+    async def test_redis_errors_are_ignored(self, monkeypatch):
+        """Test the cache degrades to a miss when Redis is unavailable."""
+
+        async def fail(*args, **kwargs):
+            raise RedisError("down")
+
+        redis = SimpleNamespace(get=fail, set=fail)
+        monkeypatch.setattr(workflow_engine, "get_redis", lambda: redis)
+
+        await workflow_engine._cache_node_result("k", {"output": "hi"}, 60)
+
+        assert await workflow_engine._get_cached_node_result("k") is None
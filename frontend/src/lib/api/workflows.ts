@@ -106,7 +106,6 @@ export interface WorkflowExecutionInfo {
 	status: ExecutionStatus;
 	inputs?: Record<string, unknown>;
 	outputs?: Record<string, unknown>;
-	node_states?: Record<string, unknown>;
 	current_node_id?: string;
 	error_message?: string;
 	logs: NodeExecutionLog[];